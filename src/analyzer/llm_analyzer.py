@@ -1,20 +1,38 @@
 import os
-import json
+import orjson
 import logging
-import time
-from typing import Dict, List, Optional, Any
-from openai import OpenAI
+import asyncio
+from typing import Dict, List, Optional, Any, Iterable, Iterator
+from openai import AsyncOpenAI
+from sqlalchemy.orm import Session
 
 from src.config.config_manager import ConfigManager
 from src.storage.models import DatabaseManager, CompanyData
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("llm_analyzer")
 
+# JSON schema the model's classification must conform to
+CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "core_theme": {
+            "type": "string",
+            "description": "The Core Theme (or Non-Core) classification"
+        },
+        "core_theme_rationale": {
+            "type": "string",
+            "description": "A brief rationale for the Core Theme classification (2-4 sentences)"
+        },
+        "tags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "All relevant tag names from the Tag Library that apply to the startup"
+        }
+    },
+    "required": ["core_theme", "core_theme_rationale", "tags"],
+    "additionalProperties": False
+}
+
 
 class LLMAnalyzer:
     """
@@ -33,106 +51,198 @@ class LLMAnalyzer:
         self.db = db_manager
         
         # Load API key
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
+        self.api_key = os.environ.get("OPENAI_API_KEY")
+        if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
         
-        # Initialize OpenAI client
-        self.client = OpenAI(api_key=api_key)
-        
         # Get model configuration
         self.model_name = self.config.get('analyzer.model', 'o4-mini-2025-04-16')
         self.classification_prompt = self.config.get_classification_prompt()
+        
+        # Maximum number of companies classified concurrently
+        self.max_concurrency = self.config.get('analyzer.max_concurrency', 20)
+        
+        # Number of classifications written to the database per commit
+        self.write_batch_size = self.config.get('analyzer.write_batch_size', 100)
     
-    def analyze_companies(self, companies: List[Dict], max_retries: int = 3, retry_delay: int = 5) -> None:
+    def analyze_companies(self, companies: Iterable[Dict], max_retries: int = 3, retry_delay: int = 5) -> None:
         """
         Analyze multiple companies using the LLM.
         
+        Companies are classified concurrently, with at most
+        `analyzer.max_concurrency` requests in flight at once.
+        
         Args:
-            companies: List of company dictionaries (must contain 'id' and 'company_launches')
+            companies: Company dictionaries (must contain 'id' and 'company_launches')
             max_retries: Maximum number of retries for LLM API calls
             retry_delay: Delay between retries in seconds
         """
-        logger.info(f"Starting to analyze {len(companies)} companies")
+        asyncio.run(self._analyze_companies_async(companies, max_retries, retry_delay))
+    
+    async def _analyze_companies_async(self, companies: Iterable[Dict], max_retries: int, retry_delay: int) -> None:
+        """
+        Analyze companies concurrently with a bounded number of LLM requests.
         
-        for company in companies:
-            company_id = company["id"]
-            company_name = company["name"]
-            company_launches = company["company_launches"]
-            
-            logger.info(f"Analyzing company: {company_name} (ID: {company_id})")
-            
-            # Skip if no company launches text
-            if not company_launches or len(company_launches.strip()) < 10:
-                logger.warning(f"Skipping company {company_name}: insufficient launch text")
-                continue
-            
-            # Analyze with retries
-            retries = 0
-            while retries <= max_retries:
+        A fixed pool of `analyzer.max_concurrency` workers takes companies from a
+        bounded queue, so companies are only read from the iterable as workers
+        free up rather than all up front.
+        
+        Args:
+            companies: Company dictionaries
+            max_retries: Maximum number of retries for LLM API calls
+            retry_delay: Delay between retries in seconds
+        """
+        queue = asyncio.Queue(maxsize=self.max_concurrency)
+        pending_updates = []
+        
+        try:
+            # The async client is bound to the running event loop, so create it per run
+            async with AsyncOpenAI(api_key=self.api_key) as client:
+                logger.info(f"Starting to analyze companies with {self.max_concurrency} workers")
+                
+                workers = [
+                    asyncio.create_task(self._analyze_worker(client, queue, pending_updates, max_retries, retry_delay))
+                    for _ in range(self.max_concurrency)
+                ]
+                
                 try:
-                    # Get classification from LLM
-                    classification = self._classify_company(company_launches)
+                    for company in companies:
+                        await queue.put(company)
                     
-                    # Store classification in database
-                    self._store_classification(company_id, classification)
+                    # One stop marker per worker, once every company is queued
+                    for _ in workers:
+                        await queue.put(None)
                     
-                    logger.info(f"Successfully analyzed company: {company_name}")
-                    break
+                    await asyncio.gather(*workers)
                 
-                except Exception as e:
-                    retries += 1
-                    if retries <= max_retries:
-                        logger.warning(f"Error analyzing company {company_name} (Attempt {retries}/{max_retries}): {e}")
-                        time.sleep(retry_delay)
-                    else:
-                        logger.error(f"Failed to analyze company {company_name} after {max_retries} attempts: {e}")
+                finally:
+                    # Stop the workers if reading companies failed
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+        
+        finally:
+            # Write whatever is left of the last batch (blocking, so keep it off the event loop)
+            if pending_updates:
+                await asyncio.to_thread(self._store_classifications, pending_updates)
     
-    def _classify_company(self, company_launches: str) -> Dict[str, Any]:
+    async def _analyze_worker(self, client: AsyncOpenAI, queue: asyncio.Queue, pending_updates: List[Dict],
+                              max_retries: int, retry_delay: int) -> None:
+        """
+        Analyze queued companies one at a time until a stop marker is taken.
+        
+        Args:
+            client: OpenAI client
+            queue: Queue of company dictionaries, with None marking the end
+            pending_updates: Classifications waiting to be written to the database
+            max_retries: Maximum number of retries for LLM API calls
+            retry_delay: Delay between retries in seconds
+        """
+        while True:
+            company = await queue.get()
+            if company is None:
+                return
+            
+            try:
+                await self._analyze_company(client, company, pending_updates, max_retries, retry_delay)
+            
+            except Exception as e:
+                logger.error(f"Error analyzing company {company.get('name')}: {e}")
+    
+    async def _analyze_company(self, client: AsyncOpenAI, company: Dict, pending_updates: List[Dict],
+                               max_retries: int, retry_delay: int) -> None:
+        """
+        Analyze a single company and queue its classification for storage.
+        
+        Args:
+            client: OpenAI client
+            company: Company dictionary
+            pending_updates: Classifications waiting to be written to the database
+            max_retries: Maximum number of retries for LLM API calls
+            retry_delay: Delay between retries in seconds
+        """
+        company_id = company["id"]
+        company_name = company["name"]
+        company_launches = company["company_launches"]
+        
+        # Skip if no company launches text
+        if not company_launches or len(company_launches.strip()) < 10:
+            logger.warning(f"Skipping company {company_name}: insufficient launch text")
+            return
+        
+        logger.info(f"Analyzing company: {company_name} (ID: {company_id})")
+        
+        # Analyze with retries
+        retries = 0
+        while retries <= max_retries:
+            try:
+                # Get classification from LLM
+                classification = await self._classify_company(client, company_launches)
+                
+                logger.info(f"Successfully analyzed company: {company_name}")
+                break
+            
+            except Exception as e:
+                retries += 1
+                if retries <= max_retries:
+                    logger.warning(f"Error analyzing company {company_name} (Attempt {retries}/{max_retries}): {e}")
+                    await asyncio.sleep(retry_delay)
+                else:
+                    logger.error(f"Failed to analyze company {company_name} after {max_retries} attempts: {e}")
+                    return
+        
+        # Queue the classification and write a full batch in one commit
+        pending_updates.append({
+            "id": company_id,
+            "ai_core_theme": classification.get("core_theme"),
+            # Same comma-separated format as CompanyData.set_ai_tags
+            "ai_tags": ",".join(classification.get("tags", [])) or None,
+            "ai_rationale": classification.get("rationale")
+        })
+        
+        if len(pending_updates) >= self.write_batch_size:
+            # Hand the batch over before writing so other analyses can keep queueing
+            batch = pending_updates[:]
+            pending_updates.clear()
+            
+            # Blocking, so keep it off the event loop
+            await asyncio.to_thread(self._store_classifications, batch)
+    
+    async def _classify_company(self, client: AsyncOpenAI, company_launches: str) -> Dict[str, Any]:
         """
         Classify a company using the LLM.
         
         Args:
+            client: OpenAI client
             company_launches: Company launch text
         
         Returns:
             Dictionary containing classification results
         """
-        # First, let the LLM analyze the company without forcing JSON
-        analysis_response = self.client.chat.completions.create(
+        # Ask for the analysis and the structured classification in a single request
+        response = await client.chat.completions.create(
             model=self.model_name,
             messages=[
                 {"role": "system", "content": "You are a startup analyst expert at analyzing companies based on Antigravity Capital's investment framework."},
                 {"role": "user", "content": self.classification_prompt.replace("{{company_launches}}", company_launches)}
-            ]
-        )
-        
-        analysis = analysis_response.choices[0].message.content
-        
-        # Then ask it to format the analysis as JSON
-        json_response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": "You are a startup analyst that provides structured JSON responses."},
-                {"role": "user", "content": f"""Here is your analysis of the company:
-
-{analysis}
-
-Based on this analysis, provide the classification in JSON format with these exact keys:
-- core_theme: The Core Theme (or Non-Core) classification
-- core_theme_rationale: A brief rationale for the Core Theme classification (2-4 sentences)
-- tags: A list of all relevant tag names from the Tag Library that apply to the startup"""},
             ],
-            response_format={"type": "json_object"}
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "classification",
+                    "schema": CLASSIFICATION_SCHEMA,
+                    "strict": True
+                }
+            }
         )
         
         # Parse the response
         try:
             # Extract classification from response text
-            classification_text = json_response.choices[0].message.content.strip()
+            classification_text = response.choices[0].message.content.strip()
             
             # Parse JSON
-            classification = json.loads(classification_text)
+            classification = orjson.loads(classification_text)
             
             # Validate classification
             if not isinstance(classification, dict):
@@ -150,51 +260,72 @@ Based on this analysis, provide the classification in JSON format with these exa
         
         except Exception as e:
             logger.error(f"Error parsing LLM response: {e}")
-            logger.error(f"Raw response: {json_response.choices[0].message.content}")
+            logger.error(f"Raw response: {response.choices[0].message.content}")
             raise ValueError(f"Failed to parse LLM response: {e}")
     
-    def _store_classification(self, company_id: int, classification: Dict[str, Any]) -> None:
+    def _store_classifications(self, updates: List[Dict]) -> None:
         """
-        Store the classification results in the database.
+        Store a batch of classification results in the database.
+        
+        If the batch cannot be written in one commit, each classification is
+        retried on its own so one bad row does not lose the rest.
         
         Args:
-            company_id: Company ID
-            classification: Classification results
+            updates: Dictionaries with the company "id" and the classification columns to set
         """
         session = self.db.get_session()
         
         try:
-            # Get company data
-            company = session.query(CompanyData).filter_by(id=company_id).first()
-            
-            if not company:
-                logger.error(f"Company not found with ID: {company_id}")
-                return
-            
-            # Update classification fields
-            company.ai_core_theme = classification.get("core_theme")
-            company.set_ai_tags(classification.get("tags", []))
-            company.ai_rationale = classification.get("rationale")
-            
+            # Issue all updates as one executemany and commit once
+            session.bulk_update_mappings(CompanyData, updates)
             session.commit()
-            logger.info(f"Stored classification for company: {company.name}")
+            logger.info(f"Stored classifications for {len(updates)} companies")
         
         except Exception as e:
             session.rollback()
-            logger.error(f"Error storing classification: {e}")
+            logger.error(f"Error storing classifications for {len(updates)} companies, retrying individually: {e}")
+            self._store_classifications_individually(session, updates)
         
         finally:
             session.close()
     
-    def get_pending_companies(self, limit: Optional[int] = None) -> List[Dict]:
+    def _store_classifications_individually(self, session: Session, updates: List[Dict]) -> None:
+        """
+        Store classification results one commit at a time.
+        
+        Args:
+            session: Database session
+            updates: Dictionaries with the company "id" and the classification columns to set
+        """
+        failed_ids = []
+        
+        for update in updates:
+            try:
+                session.bulk_update_mappings(CompanyData, [update])
+                session.commit()
+            
+            except Exception as e:
+                session.rollback()
+                failed_ids.append(update["id"])
+                logger.error(f"Error storing classification for company ID {update['id']}: {e}")
+        
+        if failed_ids:
+            logger.error(f"Classifications lost for company IDs: {failed_ids}")
+        else:
+            logger.info(f"Stored classifications for {len(updates)} companies")
+    
+    def get_pending_companies(self, limit: Optional[int] = None) -> Iterator[Dict]:
         """
         Get companies that need to be analyzed.
         
+        Rows are streamed from the database in chunks rather than loaded all
+        at once; the session stays open until the iterator is exhausted or closed.
+        
         Args:
             limit: Maximum number of companies to return
         
         Returns:
-            List of company dictionaries
+            Iterator of company dictionaries
         """
         session = self.db.get_session()
         
@@ -209,15 +340,12 @@ Based on this analysis, provide the classification in JSON format with these exa
                 query = query.limit(limit)
             
             # Convert to dictionaries
-            companies = []
-            for company in query.all():
-                companies.append({
+            for company in query.execution_options(stream_results=True).yield_per(100):
+                yield {
                     "id": company.id,
                     "name": company.name,
                     "company_launches": company.company_launches
-                })
-            
-            return companies
+                }
         
         finally:
-            session.close() 
\ No newline at end of file
+            session.close()
@@ -1,8 +1,38 @@
 import os
 import yaml
+from functools import lru_cache
 from typing import Dict, Any, List
 from dotenv import load_dotenv
 
+# Prefer the libyaml C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=None)
+def _load_yaml(config_path: str) -> Any:
+    """
+    Read and parse a YAML file, caching the result per path.
+    
+    The returned object is shared between callers and must not be mutated.
+    
+    Args:
+        config_path: Path to the YAML file
+    
+    Returns:
+        Parsed YAML content
+    """
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
+@lru_cache(maxsize=1)
+def _load_env() -> None:
+    """
+    Load environment variables from the .env file once per process.
+    """
+    load_dotenv()
+
+
 class ConfigManager:
     """
     Configuration manager to load and provide access to application settings
@@ -16,8 +46,11 @@ class ConfigManager:
         Args:
             config_path: Path to the YAML configuration file
         """
-        # Load environment variables
-        load_dotenv()
+        # Load environment variables (the .env file is only read by the first instance)
+        _load_env()
+        
+        # Classification prompt, resolved on first use
+        self._classification_prompt = None
         
         # Load YAML configuration
         self.config_path = config_path
@@ -34,8 +67,9 @@ class ConfigManager:
             Dict containing configuration settings
         """
         try:
-            with open(self.config_path, 'r') as f:
-                return yaml.safe_load(f)
+            # _process_env_vars rebuilds every dict and list, so the cached
+            # object is never mutated through self.config
+            return _load_yaml(self.config_path)
         except Exception as e:
             print(f"Error loading configuration: {e}")
             return {}
@@ -105,16 +139,20 @@ class ConfigManager:
         Returns:
             Prompt template string
         """
+        if self._classification_prompt is not None:
+            return self._classification_prompt
+        
         # First try to get from environment variable
         env_prompt = os.environ.get("CLASSIFIER_PROMPT")
         if env_prompt:
             print("Found CLASSIFIER_PROMPT in environment variables")
-            return env_prompt
-            
-        # Fall back to config file
-        config_prompt = self.get('analyzer.classification_prompt', '')
-        print("Using prompt from config file")
-        return config_prompt
+            self._classification_prompt = env_prompt
+        else:
+            # Fall back to config file
+            print("Using prompt from config file")
+            self._classification_prompt = self.get('analyzer.classification_prompt', '')
+        
+        return self._classification_prompt
     
     def get_csv_columns(self) -> List[str]:
         """
@@ -1,20 +1,39 @@
 import os
 import logging
 import csv
-import pandas as pd
-from typing import List, Dict, Optional
+import gzip
+import io
+from operator import itemgetter
+from typing import Dict, Generator, IO, Iterator, Optional
 from datetime import datetime
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
 
 from src.config.config_manager import ConfigManager
 from src.storage.models import DatabaseManager, CompanyData, CompanyUrlRecord
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("csv_exporter")
 
+# Company fields available for export, in default column order
+EXPORT_FIELDS = (
+    "name",
+    "location",
+    "description",
+    "yc_website",
+    "company_website",
+    "company_linkedin_urls",
+    "founder_linkedin_urls",
+    "company_launches",
+    "founder_names",
+    "ai_core_theme",
+    "ai_tags",
+    "ai_rationale",
+    "yc_batch",
+)
+
+# Columnar formats written with pyarrow instead of the csv module
+ARROW_FORMATS = {"parquet", "feather"}
+
 
 class CSVExporter:
     """
@@ -32,7 +51,23 @@ class CSVExporter:
         self.config = config_manager
         self.db = db_manager
         self.export_path = self.config.get('storage.export_path', 'data/exports')
-        self.csv_columns = self.config.get_csv_columns()
+        # Export every field when no columns are configured
+        self.csv_columns = tuple(self.config.get_csv_columns() or EXPORT_FIELDS)
+        
+        # Configured columns that are not company fields are exported empty
+        self.empty_columns = tuple(name for name in self.csv_columns if name not in EXPORT_FIELDS)
+        
+        # Pulls the configured columns, in order, out of a formatted company dictionary
+        getter = itemgetter(*self.csv_columns)
+        self.row_getter = getter if len(self.csv_columns) > 1 else lambda company: (getter(company),)
+        
+        # Only select the columns that will be written to the CSV
+        self.query_columns = [
+            getattr(CompanyData, name) for name in self.csv_columns if name in EXPORT_FIELDS
+        ] or [CompanyData.id]
+        
+        # Output format: "csv" (default), "parquet" or "feather"
+        self.export_format = self.config.get('storage.export_format', 'csv')
         
         # Create export directory if it doesn't exist
         os.makedirs(self.export_path, exist_ok=True)
@@ -54,15 +89,13 @@ class CSVExporter:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"yc_companies_{timestamp}.csv"
         
-        # Get all companies
-        companies = self._get_all_companies()
-        
         # Export to CSV
         csv_path = os.path.join(self.export_path, filename)
         
-        logger.info(f"Exporting {len(companies)} companies to {csv_path}")
+        logger.info(f"Exporting companies to {csv_path}")
         
-        return self._export_to_csv(companies, csv_path)
+        with self.db.session_scope() as session:
+            return self._export_to_csv(self._get_all_companies(session), csv_path)
     
     def export_companies_by_batch(self, batch: str, filename: Optional[str] = None) -> str:
         """
@@ -82,15 +115,13 @@ class CSVExporter:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"yc_companies_{batch}_{timestamp}.csv"
         
-        # Get companies from the specified batch
-        companies = self._get_companies_by_batch(batch)
-        
         # Export to CSV
         csv_path = os.path.join(self.export_path, filename)
         
-        logger.info(f"Exporting {len(companies)} companies from batch {batch} to {csv_path}")
+        logger.info(f"Exporting companies from batch {batch} to {csv_path}")
         
-        return self._export_to_csv(companies, csv_path)
+        with self.db.session_scope() as session:
+            return self._export_to_csv(self._get_companies_by_batch(session, batch), csv_path)
     
     def export_analyzed_companies(self, filename: Optional[str] = None) -> str:
         """
@@ -109,149 +140,197 @@ class CSVExporter:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"yc_companies_analyzed_{timestamp}.csv"
         
-        # Get analyzed companies
-        companies = self._get_analyzed_companies()
-        
         # Export to CSV
         csv_path = os.path.join(self.export_path, filename)
         
-        logger.info(f"Exporting {len(companies)} analyzed companies to {csv_path}")
+        logger.info(f"Exporting analyzed companies to {csv_path}")
         
-        return self._export_to_csv(companies, csv_path)
+        with self.db.session_scope() as session:
+            return self._export_to_csv(self._get_analyzed_companies(session), csv_path)
     
-    def _get_all_companies(self) -> List[Dict]:
+    def _get_all_companies(self, session: Session) -> Generator[Dict, None, None]:
         """
         Get all companies from the database.
         
+        Args:
+            session: Database session for the export
+        
         Returns:
-            List of company data dictionaries
+            Iterator of company data dictionaries
         """
-        session = self.db.get_session()
-        
-        try:
-            companies = []
-            
-            company_records = session.query(CompanyData).all()
-            
-            for record in company_records:
-                company_data = self._format_company_data(record)
-                companies.append(company_data)
-            
-            return companies
+        company_records = session.query(*self.query_columns).execution_options(
+            stream_results=True
+        ).yield_per(500)
         
-        finally:
-            session.close()
+        for record in company_records:
+            yield self._format_company_data(record)
     
-    def _get_companies_by_batch(self, batch: str) -> List[Dict]:
+    def _get_companies_by_batch(self, session: Session, batch: str) -> Generator[Dict, None, None]:
         """
         Get companies from a specific batch from the database.
         
         Args:
+            session: Database session for the export
             batch: YC batch identifier (e.g., "W25")
         
         Returns:
-            List of company data dictionaries
+            Iterator of company data dictionaries
         """
-        session = self.db.get_session()
+        company_records = session.query(*self.query_columns).filter(
+            CompanyData.yc_batch == batch
+        ).execution_options(stream_results=True).yield_per(500)
         
-        try:
-            companies = []
-            
-            company_records = session.query(CompanyData).filter_by(yc_batch=batch).all()
-            
-            for record in company_records:
-                company_data = self._format_company_data(record)
-                companies.append(company_data)
-            
-            return companies
-        
-        finally:
-            session.close()
+        for record in company_records:
+            yield self._format_company_data(record)
     
-    def _get_analyzed_companies(self) -> List[Dict]:
+    def _get_analyzed_companies(self, session: Session) -> Generator[Dict, None, None]:
         """
         Get companies that have been analyzed from the database.
         
+        Args:
+            session: Database session for the export
+        
         Returns:
-            List of company data dictionaries
+            Iterator of company data dictionaries
         """
-        session = self.db.get_session()
+        company_records = session.query(*self.query_columns).filter(
+            CompanyData.ai_core_theme.isnot(None)
+        ).execution_options(stream_results=True).yield_per(500)
         
-        try:
-            companies = []
-            
-            company_records = session.query(CompanyData).filter(
-                CompanyData.ai_core_theme.isnot(None)
-            ).all()
-            
-            for record in company_records:
-                company_data = self._format_company_data(record)
-                companies.append(company_data)
-            
-            return companies
-        
-        finally:
-            session.close()
+        for record in company_records:
+            yield self._format_company_data(record)
     
-    def _format_company_data(self, record: CompanyData) -> Dict:
+    def _format_company_data(self, row: Row) -> Dict:
         """
-        Format a company data record for CSV export.
+        Format a company data row for CSV export.
         
         Args:
-            record: CompanyData record
+            row: Result row holding the selected CompanyData columns
         
         Returns:
             Dictionary with formatted company data
         """
-        company_data = {
-            "name": record.name,
-            "location": record.location,
-            "description": record.description,
-            "yc_website": record.yc_website,
-            "company_website": record.company_website,
-            "company_linkedin_urls": ",".join(record.get_company_linkedin_url_list()),
-            "founder_linkedin_urls": ",".join(record.get_founder_linkedin_url_list()),
-            "company_launches": record.company_launches,
-            "founder_names": ",".join(record.get_founder_names_list()),
-            "ai_core_theme": record.ai_core_theme,
-            "ai_tags": ",".join(record.get_ai_tags_list()),
-            "ai_rationale": record.ai_rationale,
-            "yc_batch": record.yc_batch
-        }
+        # List fields are stored comma-joined, which is already their export format
+        company_data = row._asdict()
+        
+        for field in self.empty_columns:
+            company_data[field] = ""
         
         return company_data
     
-    def _export_to_csv(self, companies: List[Dict], csv_path: str) -> str:
+    def _export_to_csv(self, companies: Iterator[Dict], csv_path: str) -> str:
         """
         Export company data to a CSV file.
         
+        Rows are written as they are produced, without collecting them in memory first.
+        
         Args:
-            companies: List of company data dictionaries
+            companies: Company data dictionaries
             csv_path: Path to the CSV file
         
         Returns:
-            Path to the exported CSV file
+            Path to the exported file
         """
+        if self.export_format in ARROW_FORMATS:
+            return self._export_to_arrow(companies, csv_path)
+        
         try:
-            # Filter the dictionary columns to only include the configured columns
-            filtered_companies = []
-            for company in companies:
-                filtered_company = {col: company.get(col, "") for col in self.csv_columns}
-                filtered_companies.append(filtered_company)
-            
-            # Convert to DataFrame and export
-            df = pd.DataFrame(filtered_companies)
-            
-            # Ensure directory exists
+            # Ensure directory exists (the filename may include subdirectories)
             os.makedirs(os.path.dirname(csv_path), exist_ok=True)
             
-            # Export to CSV
-            df.to_csv(csv_path, index=False, quoting=csv.QUOTE_MINIMAL)
+            with self._open_csv(csv_path) as f:
+                writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL, lineterminator=os.linesep)
+                writer.writerow(self.csv_columns)
+                
+                # Only the configured columns are written; other keys are ignored
+                row_count = 0
+                for company in companies:
+                    writer.writerow(self.row_getter(company))
+                    row_count += 1
             
-            logger.info(f"Successfully exported {len(companies)} companies to {csv_path}")
+            logger.info(f"Successfully exported {row_count} companies to {csv_path}")
             
             return csv_path
         
         except Exception as e:
             logger.error(f"Error exporting to CSV: {e}")
-            raise 
\ No newline at end of file
+            raise
+    
+    def _open_csv(self, csv_path: str) -> IO[str]:
+        """
+        Open a CSV file for writing, compressing it when the path ends in .gz or .zst.
+        
+        Args:
+            csv_path: Path to the CSV file
+        
+        Returns:
+            Text file object to write the CSV to
+        """
+        if csv_path.endswith(".gz"):
+            # Fast compression level; CSV text compresses well even at level 1
+            return gzip.open(csv_path, 'wt', compresslevel=1, encoding='utf-8', newline='')
+        
+        if csv_path.endswith(".zst"):
+            try:
+                import zstandard
+            except ImportError:
+                logger.error("zstandard is required for .zst export (pip install zstandard)")
+                raise
+            
+            compressed = zstandard.ZstdCompressor(level=3).stream_writer(open(csv_path, 'wb'))
+            return io.TextIOWrapper(compressed, encoding='utf-8', newline='')
+        
+        # A large buffer keeps the number of write calls low on big exports
+        return open(csv_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+    
+    def _export_to_arrow(self, companies: Iterator[Dict], csv_path: str) -> str:
+        """
+        Export company data to a Parquet or Feather file.
+        
+        The file is written next to the requested CSV path, with the extension
+        replaced to match the configured export format.
+        
+        Args:
+            companies: Company data dictionaries
+            csv_path: Path the CSV file would have been written to
+        
+        Returns:
+            Path to the exported file
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.error(f"pyarrow is required for {self.export_format} export (pip install pyarrow)")
+            raise
+        
+        export_path = f"{os.path.splitext(csv_path)[0]}.{self.export_format}"
+        
+        try:
+            # Ensure directory exists (the filename may include subdirectories)
+            os.makedirs(os.path.dirname(export_path), exist_ok=True)
+            
+            # Stage the rows column by column, which maps directly onto Arrow's layout
+            columns = {column: [] for column in self.csv_columns}
+            appenders = [columns[column].append for column in self.csv_columns]
+            for company in companies:
+                for append, value in zip(appenders, self.row_getter(company)):
+                    append(value)
+            
+            # Flat table with the configured columns in order, even when there are no rows
+            schema = pa.schema([(column, pa.string()) for column in self.csv_columns])
+            table = pa.Table.from_pydict(columns, schema=schema)
+            
+            if self.export_format == "parquet":
+                pq.write_table(table, export_path, compression="zstd")
+            else:
+                feather.write_feather(table, export_path, compression="zstd")
+            
+            logger.info(f"Successfully exported {table.num_rows} companies to {export_path}")
+            
+            return export_path
+        
+        except Exception as e:
+            logger.error(f"Error exporting to {self.export_format}: {e}")
+            raise
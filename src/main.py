@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 import os
+import asyncio
 import logging
 import argparse
 from tqdm import tqdm
 from typing import List
 
+# uvloop is an optional, faster event loop for the async scraping, analysis and Notion runs
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from src.config.config_manager import ConfigManager
 from src.storage.models import DatabaseManager
 from src.scraper.url_discovery import YCDirectoryScraper
@@ -69,6 +76,10 @@ def main():
     # Parse command line arguments
     args = parse_args()
     
+    # Every asyncio.run in the pipeline uses uvloop when it is installed
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     # Load configuration
     config = ConfigManager(args.config)
     
@@ -89,10 +100,10 @@ def main():
     
     # Execute workflow
     if not args.analyze_only:
-        # Step 1: Scrape company URLs from YC directory
-        for batch in batches:
-            logger.info(f"Scraping URLs for batch: {batch}")
-            urls = url_scraper.scrape_directory(batch)
+        # Step 1: Scrape company URLs from YC directory, several batches at a time
+        logger.info(f"Scraping URLs for batches: {', '.join(batches)}")
+        
+        for batch, urls in url_scraper.scrape_directories(batches).items():
             logger.info(f"Found {len(urls)} company URLs for batch {batch}")
         
         # Step 2: Scrape company details
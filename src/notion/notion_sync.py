@@ -1,20 +1,102 @@
 import os
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+import random
+import orjson
+import httpx
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Callable, Awaitable
 from datetime import datetime
-from notion_client import Client
+from notion_client import AsyncClient
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+from sqlalchemy.orm import joinedload
 
 from src.config.config_manager import ConfigManager
 from src.storage.models import DatabaseManager, CompanyData, CompanyUrlRecord
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("notion_sync")
 
 
+@lru_cache(maxsize=4096)
+def _multi_select_options(tags: Tuple[str, ...]) -> List[Dict[str, str]]:
+    """
+    Build Notion multi-select options for a set of tags.
+    
+    The result is cached and shared between payloads, so it must not be modified.
+    
+    Args:
+        tags: Tag names
+    
+    Returns:
+        List of multi-select option objects
+    """
+    return [{"name": tag} for tag in tags]
+
+
+def _rich_text(content: str) -> Dict[str, Any]:
+    """
+    Build a Notion rich text property value.
+    
+    Args:
+        content: Plain text content
+    
+    Returns:
+        Rich text property value
+    """
+    return {"rich_text": [{"text": {"content": content}}]}
+
+
+def _title(content: str) -> Dict[str, Any]:
+    """
+    Build a Notion title property value.
+    
+    Args:
+        content: Plain text content
+    
+    Returns:
+        Title property value
+    """
+    return {"title": [{"text": {"content": content}}]}
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """
+    Get the delay before a failed Notion request may be retried.
+    
+    Args:
+        error: Error raised by the request
+    
+    Returns:
+        Seconds to wait (from Retry-After when Notion sent one, else 0),
+        or None if the error is not worth retrying
+    """
+    if isinstance(error, (RequestTimeoutError, httpx.TransportError)):
+        return 0.0
+    
+    # Rate limits and server errors are transient; other responses will fail the same way again
+    if isinstance(error, HTTPResponseError) and (error.status == 429 or error.status >= 500):
+        try:
+            return float(error.headers.get("Retry-After", 0))
+        except ValueError:
+            return 0.0
+    
+    return None
+
+
+def _content_hash(properties: Dict[str, Any]) -> str:
+    """
+    Hash a Notion properties object.
+    
+    Args:
+        properties: Notion page properties
+    
+    Returns:
+        Hex digest identifying the properties content
+    """
+    return hashlib.blake2b(orjson.dumps(properties, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
 class NotionSync:
     """
     Module for synchronizing company data with Notion.
@@ -47,14 +129,16 @@ class NotionSync:
             self.enabled = False
             return
         
-        # Initialize Notion client
-        try:
-            self.client = Client(auth=self.api_token)
-            self.enabled = True
-            logger.info(f"Notion integration enabled, using database ID: {self.database_id}")
-        except Exception as e:
-            logger.error(f"Error initializing Notion client: {e}")
-            self.enabled = False
+        # Maximum number of Notion requests in flight at once (Notion allows ~3 requests/second)
+        self.max_concurrency = self.config.get("notion.max_concurrency", 3)
+        
+        # Retries for rate-limited or failed requests, with exponential backoff from retry_delay seconds
+        self.max_retries = self.config.get("notion.max_retries", 4)
+        self.retry_delay = self.config.get("notion.retry_delay", 0.5)
+        
+        # The async Notion client is bound to the running event loop, so it is created per sync run
+        self.enabled = True
+        logger.info(f"Notion integration enabled, using database ID: {self.database_id}")
     
     def sync_company(self, company_id: int) -> Optional[str]:
         """
@@ -70,47 +154,30 @@ class NotionSync:
             logger.warning("Notion integration is not enabled. Cannot sync company.")
             return None
         
-        logger.info(f"Syncing company ID {company_id} to Notion")
-        
-        session = self.db.get_session()
-        
         try:
-            # Get company data
-            company = session.query(CompanyData).filter_by(id=company_id).first()
+            with self.db.session_scope() as session:
+                # Get company data
+                company = session.query(CompanyData).options(
+                    joinedload(CompanyData.url_record)
+                ).filter_by(id=company_id).first()
             
             if not company:
                 logger.error(f"Company not found with ID: {company_id}")
                 return None
             
-            # Check if company has already been synced
-            url_record = company.url_record
-            
-            if url_record and url_record.notion_page_id:
-                # Update existing Notion page
-                notion_page_id = self._update_notion_page(company, url_record.notion_page_id)
-            else:
-                # Create new Notion page
-                notion_page_id = self._create_notion_page(company)
-                
-                # Update URL record with Notion page ID
-                if notion_page_id and url_record:
-                    url_record.notion_page_id = notion_page_id
-                    session.commit()
-            
-            return notion_page_id
+            return asyncio.run(self._sync_companies_async([company]))[0]
         
         except Exception as e:
-            session.rollback()
             logger.error(f"Error syncing company {company_id} to Notion: {e}")
             return None
-        
-        finally:
-            session.close()
     
     def sync_all_companies(self) -> int:
         """
         Sync all companies to Notion.
         
+        Companies are synced concurrently, with at most `notion.max_concurrency`
+        Notion requests in flight at once.
+        
         Returns:
             Number of companies synced
         """
@@ -120,149 +187,269 @@ class NotionSync:
         
         logger.info("Syncing all companies to Notion")
         
-        session = self.db.get_session()
+        try:
+            # The records stay loaded once the session closes; each synced company's
+            # page ID is committed on its own as soon as its Notion request finishes
+            with self.db.session_scope() as session:
+                # Get all companies that have been analyzed, with their URL records in the same query
+                company_records = session.query(CompanyData).options(
+                    joinedload(CompanyData.url_record)
+                ).filter(
+                    CompanyData.ai_core_theme.isnot(None)
+                ).all()
+            
+            results = asyncio.run(self._sync_companies_async(company_records))
+        
+        except Exception as e:
+            logger.error(f"Error syncing companies to Notion: {e}")
+            return 0
+        
+        sync_count = sum(1 for notion_page_id in results if notion_page_id)
+        
+        logger.info(f"Successfully synced {sync_count}/{len(company_records)} companies to Notion")
+        
+        return sync_count
+    
+    async def _sync_companies_async(self, companies: List[CompanyData]) -> List[Optional[str]]:
+        """
+        Sync companies to Notion concurrently with a bounded number of requests.
+        
+        A fixed pool of `notion.max_concurrency` workers takes companies from a
+        queue, so the number of tasks does not grow with the number of companies.
+        
+        Args:
+            companies: Company data records with their URL records loaded
+        
+        Returns:
+            Notion page ID, or None if the sync failed, for each company
+        """
+        queue = asyncio.Queue()
+        for index, company in enumerate(companies):
+            queue.put_nowait((index, company))
+        
+        notion_page_ids = [None] * len(companies)
+        
+        # Concurrent requests share one HTTP/2 connection instead of each opening their own;
+        # the Notion client sets the base URL, headers and timeout on it
+        client = AsyncClient(
+            auth=self.api_token,
+            client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=self.max_concurrency)
+            )
+        )
         
         try:
-            # Get all companies that have been analyzed
-            company_records = session.query(CompanyData).filter(
-                CompanyData.ai_core_theme.isnot(None)
-            ).all()
-            
-            sync_count = 0
-            
-            for company in company_records:
-                notion_page_id = self.sync_company(company.id)
-                
-                if notion_page_id:
-                    sync_count += 1
+            await asyncio.gather(
+                *[self._sync_worker(client, queue, notion_page_ids)
+                  for _ in range(min(self.max_concurrency, len(companies)))]
+            )
+        
+        finally:
+            await client.aclose()
+        
+        return notion_page_ids
+    
+    async def _sync_worker(self, client: AsyncClient, queue: asyncio.Queue,
+                           notion_page_ids: List[Optional[str]]) -> None:
+        """
+        Sync queued companies one at a time until the queue is empty.
+        
+        Args:
+            client: Notion client
+            queue: Queue of (position, company) pairs still to sync
+            notion_page_ids: Results by position; the Notion page ID is stored for each synced company
+        """
+        while True:
+            try:
+                index, company = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
             
-            logger.info(f"Successfully synced {sync_count}/{len(company_records)} companies to Notion")
+            try:
+                notion_page_ids[index] = await self._sync_company_obj(client, company)
             
-            return sync_count
+            except Exception as e:
+                logger.error(f"Error syncing company {company.name} to Notion: {e}")
+    
+    async def _sync_company_obj(self, client: AsyncClient, company: CompanyData) -> Optional[str]:
+        """
+        Sync a single, already loaded company to Notion.
         
-        finally:
-            session.close()
+        The Notion page ID and content hash are committed to the URL record as
+        soon as the request succeeds, so an interrupted run never loses track of
+        pages it already created.
+        
+        Args:
+            client: Notion client
+            company: Company data record
+        
+        Returns:
+            Notion page ID if synced successfully, None otherwise
+        """
+        logger.info(f"Syncing company ID {company.id} to Notion")
+        
+        # Check if company has already been synced
+        url_record = company.url_record
+        content_hash = _content_hash(self._build_properties(company, include_title=False))
+        
+        if url_record and url_record.notion_page_id:
+            # Skip the request if nothing changed since the last sync
+            if url_record.notion_content_hash == content_hash:
+                logger.info(f"Notion page for company {company.name} is up to date")
+                return url_record.notion_page_id
+            
+            # Update existing Notion page
+            notion_page_id = await self._update_notion_page(client, company, url_record.notion_page_id)
+        else:
+            # Create new Notion page
+            notion_page_id = await self._create_notion_page(client, company)
+        
+        # Store the page ID and remember what was synced so unchanged companies
+        # are skipped next time (blocking, so keep it off the event loop)
+        if notion_page_id and url_record:
+            await asyncio.to_thread(self._store_sync_state, url_record.id, notion_page_id, content_hash)
+            url_record.notion_page_id = notion_page_id
+            url_record.notion_content_hash = content_hash
+        
+        return notion_page_id
     
-    def _create_notion_page(self, company: CompanyData) -> Optional[str]:
+    def _store_sync_state(self, url_record_id: int, notion_page_id: str, content_hash: str) -> None:
         """
-        Create a new page in Notion for the company.
+        Commit the Notion page ID and content hash of a synced company.
+        
+        Args:
+            url_record_id: ID of the company's URL record
+            notion_page_id: Notion page ID
+            content_hash: Hash of the properties synced to the page
+        """
+        with self.db.session_scope() as session:
+            session.query(CompanyUrlRecord).filter_by(id=url_record_id).update({
+                "notion_page_id": notion_page_id,
+                "notion_content_hash": content_hash
+            })
+    
+    async def _call_with_retries(self, request: Callable[..., Awaitable[Dict[str, Any]]], **kwargs: Any) -> Dict[str, Any]:
+        """
+        Make a Notion request, retrying transient failures.
+        
+        Rate limits, server errors and timeouts are retried with jittered
+        exponential backoff, or after Notion's Retry-After delay if it is longer.
+        
+        Args:
+            request: Notion client endpoint method
+            **kwargs: Arguments for the request
+        
+        Returns:
+            Response from Notion
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await request(**kwargs)
+            
+            except Exception as e:
+                retry_after = _retry_after(e)
+                if retry_after is None or attempt == self.max_retries:
+                    raise
+                
+                delay = max(retry_after, self.retry_delay * 2 ** attempt * random.uniform(1, 2))
+                logger.warning(f"Notion request failed (attempt {attempt + 1}/{self.max_retries + 1}), retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    def _build_properties(self, company: CompanyData, include_title: bool) -> Dict[str, Any]:
+        """
+        Build the Notion properties object for a company.
         
         Args:
             company: Company data record
+            include_title: Whether to include the "Name" title property (only set on creation)
         
         Returns:
-            Notion page ID if created successfully, None otherwise
+            Dictionary of Notion page properties
         """
-        try:
-            # Build the properties object for the new page
-            properties = {
-                "Name": {
-                    "title": [
-                        {
-                            "text": {
-                                "content": company.name
-                            }
-                        }
-                    ]
+        properties = {}
+        
+        # Add name if creating the page
+        if include_title:
+            properties["Name"] = _title(company.name)
+        
+        # Add description if it exists
+        if company.description:
+            properties["Description"] = _rich_text(company.description)
+        
+        # Add core theme if it exists
+        if company.ai_core_theme:
+            properties["Core Themes"] = {
+                "select": {
+                    "name": company.ai_core_theme
                 }
             }
-            
-            # Add description if it exists
-            if company.description:
-                properties["Description"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": company.description
-                            }
+        
+        # Add tags if they exist
+        if company.ai_tags:
+            properties["Tags"] = {
+                "multi_select": _multi_select_options(tuple(company.get_ai_tags_list()))
+            }
+        
+        # Add website if it exists
+        if company.company_website:
+            properties["Website"] = {
+                "url": company.company_website
+            }
+        
+        # Add YC profile link as Deck
+        if company.yc_website:
+            properties["Deck"] = {
+                "files": [
+                    {
+                        "name": "YC Page",
+                        "type": "external",
+                        "external": {
+                            "url": company.yc_website
                         }
-                    ]
-                }
-            
-            # Add core theme if it exists
-            if company.ai_core_theme:
-                properties["Core Themes"] = {
-                    "select": {
-                        "name": company.ai_core_theme
                     }
-                }
-            
-            # Add tags if they exist
-            if company.ai_tags:
-                properties["Tags"] = {
-                    "multi_select": [
-                        {"name": tag} for tag in company.get_ai_tags_list()
-                    ]
-                }
-            
-            # Add website if it exists
-            if company.company_website:
-                properties["Website"] = {
-                    "url": company.company_website
-                }
-            
-            # Add YC profile link as Deck
-            if company.yc_website:
-                properties["Deck"] = {
-                    "files": [
-                        {
-                            "name": "YC Page",
-                            "type": "external",
-                            "external": {
-                                "url": company.yc_website
-                            }
-                        }
-                    ]
-                }
-            
-            # Add company LinkedIn if it exists
-            company_linkedin = company.get_company_linkedin_url_list()
-            if company_linkedin:
-                properties["Company LinkedIn"] = {
-                    "url": company_linkedin[0] if company_linkedin else None
-                }
-            
-            # Add founder LinkedIn URLs if they exist
-            founder_linkedin = company.get_founder_linkedin_url_list()
-            if founder_linkedin:
-                properties["Founder LinkedIn"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": ", ".join(founder_linkedin)
-                            }
-                        }
-                    ]
-                }
-            
-            # Add location if it exists
-            if company.location:
-                properties["Location"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": company.location
-                            }
-                        }
-                    ]
-                }
-            
-            # Add analysis rationale if it exists
-            if company.ai_rationale:
-                properties["Analysis Rationale"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": company.ai_rationale
-                            }
-                        }
-                    ]
-                }
-            
+                ]
+            }
+        
+        # Add company LinkedIn if it exists
+        company_linkedin = company.get_company_linkedin_url_list()
+        if company_linkedin:
+            properties["Company LinkedIn"] = {
+                "url": company_linkedin[0]
+            }
+        
+        # Add founder LinkedIn URLs if they exist
+        founder_linkedin = company.get_founder_linkedin_url_list()
+        if founder_linkedin:
+            properties["Founder LinkedIn"] = _rich_text(", ".join(founder_linkedin))
+        
+        # Add location if it exists
+        if company.location:
+            properties["Location"] = _rich_text(company.location)
+        
+        # Add analysis rationale if it exists
+        if company.ai_rationale:
+            properties["Analysis Rationale"] = _rich_text(company.ai_rationale)
+        
+        return properties
+    
+    async def _create_notion_page(self, client: AsyncClient, company: CompanyData) -> Optional[str]:
+        """
+        Create a new page in Notion for the company.
+        
+        Args:
+            client: Notion client
+            company: Company data record
+        
+        Returns:
+            Notion page ID if created successfully, None otherwise
+        """
+        try:
             # Create the page
-            response = self.client.pages.create(
+            response = await self._call_with_retries(
+                client.pages.create,
                 parent={"database_id": self.database_id},
-                properties=properties
+                properties=self._build_properties(company, include_title=True)
             )
             
             logger.info(f"Created Notion page for company: {company.name}")
@@ -273,11 +460,12 @@ class NotionSync:
             logger.error(f"Error creating Notion page for company {company.name}: {e}")
             return None
     
-    def _update_notion_page(self, company: CompanyData, page_id: str) -> Optional[str]:
+    async def _update_notion_page(self, client: AsyncClient, company: CompanyData, page_id: str) -> Optional[str]:
         """
         Update an existing page in Notion for the company.
         
         Args:
+            client: Notion client
             company: Company data record
             page_id: Notion page ID
         
@@ -285,105 +473,11 @@ class NotionSync:
             Notion page ID if updated successfully, None otherwise
         """
         try:
-            # Build the properties object for the page update
-            properties = {}
-            
-            # Update description if it exists
-            if company.description:
-                properties["Description"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": company.description
-                            }
-                        }
-                    ]
-                }
-            
-            # Update core theme if it exists
-            if company.ai_core_theme:
-                properties["Core Themes"] = {
-                    "select": {
-                        "name": company.ai_core_theme
-                    }
-                }
-            
-            # Update tags if they exist
-            if company.ai_tags:
-                properties["Tags"] = {
-                    "multi_select": [
-                        {"name": tag} for tag in company.get_ai_tags_list()
-                    ]
-                }
-            
-            # Update website if it exists
-            if company.company_website:
-                properties["Website"] = {
-                    "url": company.company_website
-                }
-            
-            # Update YC profile link as Deck
-            if company.yc_website:
-                properties["Deck"] = {
-                    "files": [
-                        {
-                            "name": "YC Page",
-                            "type": "external",
-                            "external": {
-                                "url": company.yc_website
-                            }
-                        }
-                    ]
-                }
-            
-            # Update company LinkedIn if it exists
-            company_linkedin = company.get_company_linkedin_url_list()
-            if company_linkedin:
-                properties["Company LinkedIn"] = {
-                    "url": company_linkedin[0] if company_linkedin else None
-                }
-            
-            # Update founder LinkedIn URLs if they exist
-            founder_linkedin = company.get_founder_linkedin_url_list()
-            if founder_linkedin:
-                properties["Founder LinkedIn"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": ", ".join(founder_linkedin)
-                            }
-                        }
-                    ]
-                }
-            
-            # Update location if it exists
-            if company.location:
-                properties["Location"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": company.location
-                            }
-                        }
-                    ]
-                }
-            
-            # Update analysis rationale if it exists
-            if company.ai_rationale:
-                properties["Analysis Rationale"] = {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": company.ai_rationale
-                            }
-                        }
-                    ]
-                }
-            
             # Update the page
-            response = self.client.pages.update(
+            response = await self._call_with_retries(
+                client.pages.update,
                 page_id=page_id,
-                properties=properties
+                properties=self._build_properties(company, include_title=False)
             )
             
             logger.info(f"Updated Notion page for company: {company.name}")
@@ -392,4 +486,4 @@ class NotionSync:
         
         except Exception as e:
             logger.error(f"Error updating Notion page for company {company.name}: {e}")
-            return None 
\ No newline at end of file
+            return None
\ No newline at end of file
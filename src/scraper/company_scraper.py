@@ -1,22 +1,171 @@
-import time
+import asyncio
 import logging
 import re
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime
 from urllib.parse import urlparse
-from playwright.sync_api import sync_playwright, Page, Browser, TimeoutError
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Route
+import httpx
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert
 
 from src.config.config_manager import ConfigManager
 from src.storage.models import DatabaseManager, CompanyUrlRecord, CompanyData
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("company_scraper")
 
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Resource types the scraper never reads; aborting them saves bandwidth and page load time
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+# CSS selectors for the company page. Multi-class elements are matched on their
+# exact class attribute, the same way BeautifulSoup's class_ string matching worked.
+LOCATION_LINK_SELECTOR = 'a[href*="/companies/location/"]'
+FOUNDER_LINKEDIN_SELECTOR = 'a[href*="linkedin.com/in/"]'
+COMPANY_LINKEDIN_SELECTOR = 'a[href*="linkedin.com/company/"]'
+WEBSITE_LINK_SELECTOR = 'a.mb-2.whitespace-nowrap'
+BATCH_LINK_SELECTOR = 'a[href*="/companies?batch="]'
+EXTERNAL_LINK_SELECTOR = 'a[href^="https://"]'
+MAIN_SECTION_SELECTOR = 'section.relative.isolate'
+DESCRIPTION_SELECTOR = 'div[class="prose hidden max-w-full md:block"]'
+FOUNDER_GRID_SELECTOR = 'div[class="grid grid-cols-1 gap-6 sm:grid-cols-2"]'
+LAUNCH_CARD_SELECTOR = 'div[class="ycdc-card-new w-full max-w-[800px] rounded-xl p-8"]'
+LAUNCH_TITLE_SELECTOR = 'div[class="flex-grow pb-2 text-3xl font-bold"]'
+
+# Links to these sites (or their subdomains) are never the company's own website
+NON_COMPANY_HOSTS = frozenset({
+    'linkedin.com', 'youtube.com', 'ycombinator.com', 'startupschool.org', 'twitter.com', 'x.com',
+    'facebook.com', 'instagram.com', 'calendly.com'
+})
+
+# Batch suffix in a company URL, e.g. /companies/some-company/w25
+BATCH_IN_URL_PATTERN = re.compile(r'([ws]\d{2})(?:/|$)', re.IGNORECASE)
+
+# Elements that only exist once the company page has been rendered
+RENDERED_CONTENT_SELECTORS = ('h1', 'div.group.flex.gap-4')
+
+# Company rows are keyed by their URL record; a rescrape replaces the scraped columns
+# and leaves the AI classification alone
+# NOT NULL company columns that come from the scraped page; rows missing one
+# are kept out of the batch upsert so they cannot fail it
+REQUIRED_COMPANY_COLUMNS = ("name", "yc_website", "yc_batch")
+
+_company_insert = insert(CompanyData)
+COMPANY_UPSERT = _company_insert.on_conflict_do_update(
+    index_elements=[CompanyData.url_record_id],
+    set_={
+        **{
+            column: _company_insert.excluded[column]
+            for column in (
+                "name", "location", "description", "yc_website", "company_website", "founder_names",
+                "company_linkedin_urls", "founder_linkedin_urls", "company_launches", "yc_batch"
+            )
+        },
+        # onupdate defaults are not applied to ON CONFLICT updates
+        "last_updated": func.now()
+    }
+)
+
+# Elements whose text is not page content
+NON_CONTENT_TAGS = {"script", "style", "template"}
+
+
+async def block_unneeded_resources(route: Route) -> None:
+    """
+    Abort requests for resources that are not needed to read page content or links.
+    
+    Args:
+        route: Playwright route for the intercepted request
+    """
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def _is_non_company_link(href: str) -> bool:
+    """
+    Check whether a link points to a site that is never a company's own website.
+    
+    Args:
+        href: Link URL
+    
+    Returns:
+        True if the link's host is one of NON_COMPANY_HOSTS or a subdomain of one
+    """
+    try:
+        host = urlparse(href).hostname or ""
+    except ValueError:
+        # Malformed URLs are not usable as a website either
+        return True
+    
+    # Check the host and each parent domain, e.g. www.linkedin.com then linkedin.com
+    while host:
+        if host in NON_COMPANY_HOSTS:
+            return True
+        host = host.partition(".")[2]
+    
+    return False
+
+
+def _node_text(node: LexborNode, separator: str = "", strip: bool = False) -> str:
+    """
+    Get the text of a node, matching BeautifulSoup's get_text.
+    
+    Script and style contents are skipped, and with strip=True each text
+    fragment is stripped and empty fragments are dropped before joining.
+    
+    Args:
+        node: HTML node
+        separator: String placed between text fragments
+        strip: Whether to strip whitespace from each fragment
+    
+    Returns:
+        Text content of the node
+    """
+    fragments = []
+    
+    for child in node.traverse(include_text=True):
+        if child.tag != "-text" or child.parent.tag in NON_CONTENT_TAGS:
+            continue
+        
+        text = child.text_content
+        if strip:
+            text = text.strip()
+            if not text:
+                continue
+        fragments.append(text)
+    
+    return separator.join(fragments)
+
+
+def _inline_text(element: LexborNode) -> str:
+    """
+    Flatten a launch post paragraph or list item to text, keeping links and bold text.
+    
+    Args:
+        element: Paragraph or list item node
+    
+    Returns:
+        Text of the element's direct children
+    """
+    parts = []
+    
+    for content in element.iter(include_text=True):
+        if content.tag == 'a':
+            parts.append(f"{_node_text(content, strip=True)} ({content.attributes.get('href')}) ")
+        elif content.tag == 'strong':
+            parts.append(f"**{_node_text(content, strip=True)}** ")
+        elif content.tag == '-text':
+            parts.append(content.text_content.strip() + " ")
+        elif content.tag == '-comment':
+            # Comments count as text, like BeautifulSoup's Comment strings
+            parts.append(content.html[4:-3].strip() + " ")
+    
+    return "".join(parts)
+
 
 class CompanyScraper:
     """
@@ -37,105 +186,260 @@ class CompanyScraper:
         self.max_retries = self.config.get('scraper.max_retries', 3)
         self.timeout = self.config.get('scraper.timeout', 30000)
         self.selectors = self.config.get_selectors()
+        
+        # Maximum number of company pages scraped concurrently
+        self.max_concurrency = self.config.get('scraper.max_concurrency', 10)
+        
+        # CDP endpoint of an already running Chromium (e.g. "http://localhost:9222")
+        # shared by several scraper processes; a browser is launched when unset
+        self.cdp_endpoint = self.config.get('scraper.cdp_endpoint')
+        
+        # Most YC company pages are server-rendered, so try a plain HTTP fetch
+        # before falling back to a browser page
+        self.static_fetch = self.config.get('scraper.static_fetch', True)
+        
+        # Delay in milliseconds before every browser operation, for debugging only
+        self.slow_mo = self.config.get('scraper.slow_mo', 0)
+        
+        # Number of scraped pages written to the database per commit
+        self.write_batch_size = self.config.get('scraper.write_batch_size', 100)
     
     def scrape_companies(self, urls: List[str]) -> None:
         """
         Scrape detailed information from multiple company pages.
         
+        Pages are scraped concurrently, with at most `scraper.max_concurrency`
+        companies in progress at once.
+        
+        Args:
+            urls: List of company URLs to scrape
+        """
+        asyncio.run(self._scrape_companies_async(urls))
+    
+    async def _scrape_companies_async(self, urls: List[str]) -> None:
+        """
+        Scrape company pages concurrently with a shared browser.
+        
         Args:
             urls: List of company URLs to scrape
         """
         logger.info(f"Starting to scrape {len(urls)} company pages")
         
-        with sync_playwright() as playwright:
-            browser = self._launch_browser(playwright)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending_writes = []
+        
+        try:
+            # Fast path: parse server-rendered pages straight from HTTP responses, and
+            # only start a browser for the pages that need one
+            if self.static_fetch:
+                # The async client is bound to the running event loop, so create it per run
+                async with httpx.AsyncClient(
+                    http2=True,
+                    headers={"User-Agent": USER_AGENT},
+                    timeout=self.timeout / 1000,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=self.max_concurrency)
+                ) as client:
+                    scraped = await asyncio.gather(
+                        *[self._scrape_company_static(client, semaphore, url, pending_writes) for url in urls]
+                    )
+                
+                urls = [url for url, done in zip(urls, scraped) if not done]
+                if not urls:
+                    return
+                
+                logger.info(f"Scraping {len(urls)} company pages with the browser")
             
-            try:
-                for url in urls:
-                    self.scrape_company(browser, url)
+            # Pool of reusable pages, one per concurrency slot; None marks a page
+            # that has not been opened yet, so pages are only created when needed
+            page_pool = asyncio.Queue()
+            for _ in range(self.max_concurrency):
+                page_pool.put_nowait(None)
             
-            finally:
-                browser.close()
+            async with async_playwright() as playwright:
+                browser = await self._launch_browser(playwright)
+                
+                try:
+                    context = await self._create_context(browser)
+                    results = await asyncio.gather(
+                        *[self._scrape_company_bounded(context, page_pool, semaphore, url, pending_writes) for url in urls],
+                        return_exceptions=True
+                    )
+                
+                finally:
+                    await browser.close()
+            
+            for url, result in zip(urls, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Unexpected error scraping company page {url}: {result}")
+        
+        finally:
+            # Write whatever is left of the last batch
+            if pending_writes:
+                await asyncio.to_thread(self._store_scrape_results, pending_writes)
+    
+    async def _queue_scrape_result(self, pending_writes: List[Tuple[str, Optional[Dict]]], url: str,
+                                   company_data: Optional[Dict]) -> None:
+        """
+        Queue a scrape result for storage and write a full batch in one commit.
+        
+        Args:
+            pending_writes: Scrape results waiting to be written to the database
+            url: Company URL
+            company_data: Scraped company data, or None if scraping failed
+        """
+        pending_writes.append((url, company_data))
+        
+        if len(pending_writes) >= self.write_batch_size:
+            # Hand the batch over before writing so other scrapes can keep queueing
+            batch = pending_writes[:]
+            pending_writes.clear()
+            
+            # Blocking, so keep it off the event loop
+            await asyncio.to_thread(self._store_scrape_results, batch)
+    
+    async def _scrape_company_bounded(self, context: BrowserContext, page_pool: asyncio.Queue,
+                                      semaphore: asyncio.Semaphore, url: str,
+                                      pending_writes: List[Tuple[str, Optional[Dict]]]) -> Optional[Dict]:
+        """
+        Scrape a single company page once a concurrency slot is free.
+        
+        Args:
+            context: Browser context that pooled pages are opened in
+            page_pool: Queue of reusable pages
+            semaphore: Semaphore limiting concurrent page scrapes
+            url: Company URL to scrape
+            pending_writes: Scrape results waiting to be written to the database
+        
+        Returns:
+            Dictionary of scraped company data or None if scraping failed
+        """
+        async with semaphore:
+            return await self.scrape_company(context, page_pool, url, pending_writes)
     
-    def scrape_company(self, browser: Browser, url: str, retry_count: int = 0) -> Optional[Dict]:
+    async def scrape_company(self, context: BrowserContext, page_pool: asyncio.Queue, url: str,
+                             pending_writes: List[Tuple[str, Optional[Dict]]]) -> Optional[Dict]:
         """
         Scrape detailed information from a single company page.
         
+        Failed attempts are retried up to `scraper.max_retries` times, with the
+        delay before each retry doubling.
+        
         Args:
-            browser: Browser instance
+            context: Browser context that pooled pages are opened in
+            page_pool: Queue of reusable pages
             url: Company URL to scrape
-            retry_count: Current retry attempt
+            pending_writes: Scrape results waiting to be written to the database
         
         Returns:
             Dictionary of scraped company data or None if scraping failed
         """
         logger.info(f"Scraping company page: {url}")
         
-        # Create a new page for each company
-        page = self._create_page(browser)
-        
-        try:
-            # Navigate to the company page
-            logger.info(f"Navigating to URL: {url}")
-            page.goto(url, timeout=self.timeout)
-            time.sleep(self.page_load_delay)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                logger.info(f"Retrying... (attempt {attempt}/{self.max_retries})")
+                # Back off exponentially before each retry
+                await asyncio.sleep(self.page_load_delay * 2 ** attempt)
             
-            # Extract company data from page
-            company_data = self._extract_company_data(page, url)
+            # Reuse a pooled page, opening it on first use; the slot is always
+            # returned to the pool, even if opening the page fails
+            page = await page_pool.get()
             
-            # Store company data in database
-            self._store_company_data(company_data, url)
+            try:
+                if page is None:
+                    page = await self._create_page(context)
+                
+                # Navigate to the company page
+                logger.info(f"Navigating to URL: {url}")
+                await page.goto(url, timeout=self.timeout, wait_until="domcontentloaded")
+                await asyncio.sleep(self.page_load_delay)
+                
+                # Extract company data from page
+                company_data = await self._extract_company_data(page, url)
             
-            return company_data
-        
-        except Exception as e:
-            logger.error(f"Error scraping company page {url}: {e}")
+            except Exception as e:
+                logger.error(f"Error scraping company page {url}: {e}")
+                
+                # The page may be left in a bad state, so replace it with a fresh one on next use
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception as close_error:
+                        logger.warning(f"Error closing page for {url}: {close_error}")
+                page = None
+                company_data = None
             
-            # Try again if we haven't reached max retries
-            if retry_count < self.max_retries:
-                logger.info(f"Retrying... (attempt {retry_count + 1}/{self.max_retries})")
-                time.sleep(self.page_load_delay * 2)  # Wait longer before retry
-                return self.scrape_company(browser, url, retry_count + 1)
-            else:
-                # Mark URL as failed in database
-                self._mark_url_as_failed(url)
-                return None
-        
-        finally:
-            page.close()
+            finally:
+                # Return the page before storing or retrying so other scrapes can take it
+                page_pool.put_nowait(page)
+            
+            if company_data is not None:
+                # Queue company data for storage in the database
+                await self._queue_scrape_result(pending_writes, url, company_data)
+                return company_data
+        
+        # Queue the URL to be marked as failed in the database
+        await self._queue_scrape_result(pending_writes, url, None)
+        return None
     
-    def _launch_browser(self, playwright) -> Browser:
+    async def _launch_browser(self, playwright) -> Browser:
         """
         Launch a browser instance with appropriate settings.
         
+        Connects to the shared browser instead when `scraper.cdp_endpoint` is set.
+        Closing a connected browser only disconnects and removes this scraper's
+        context; the shared Chromium keeps running.
+        
         Args:
             playwright: Playwright instance
         
         Returns:
             Browser instance
         """
-        return playwright.chromium.launch(
+        if self.cdp_endpoint:
+            logger.info(f"Connecting to shared browser at {self.cdp_endpoint}")
+            return await playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+        
+        return await playwright.chromium.launch(
             headless=True,
-            slow_mo=100,
+            slow_mo=self.slow_mo,
         )
     
-    def _create_page(self, browser: Browser) -> Page:
+    async def _create_context(self, browser: Browser) -> BrowserContext:
         """
-        Create a new browser page with appropriate settings.
+        Create the browser context shared by all pooled pages.
         
         Args:
             browser: Browser instance
         
         Returns:
-            Page instance
+            Browser context
         """
-        page = browser.new_page(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        context = await browser.new_context(
+            user_agent=USER_AGENT,
         )
+        
+        # Only the DOM is used, so skip images, fonts, media and stylesheets;
+        # routing on the context covers every pooled page with one handler
+        await context.route("**/*", block_unneeded_resources)
+        return context
+    
+    async def _create_page(self, context: BrowserContext) -> Page:
+        """
+        Create a new browser page with appropriate settings.
+        
+        Args:
+            context: Browser context to open the page in
+        
+        Returns:
+            Page instance
+        """
+        page = await context.new_page()
         page.set_default_timeout(self.timeout)
         return page
     
-    def _extract_company_data(self, page: Page, url: str) -> Dict:
+    async def _extract_company_data(self, page: Page, url: str) -> Dict:
         """
         Extract detailed company information from a company page.
         
@@ -147,87 +451,150 @@ class CompanyScraper:
             Dictionary containing all extracted company information
         """
         # Wait for key elements to load
-        page.wait_for_selector('h1', timeout=self.timeout)
-        page.wait_for_selector('div.group.flex.gap-4', timeout=self.timeout)
+        for selector in RENDERED_CONTENT_SELECTORS:
+            await page.wait_for_selector(selector, timeout=self.timeout)
+        
+        return self._parse_company_tree(LexborHTMLParser(await page.content()), url)
+    
+    async def _scrape_company_static(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str,
+                                     pending_writes: List[Tuple[str, Optional[Dict]]]) -> bool:
+        """
+        Scrape and store a company page from its static HTML, once a concurrency slot is free.
         
-        html_content = page.content()
-        soup = BeautifulSoup(html_content, 'html.parser')
+        Args:
+            client: HTTP client
+            semaphore: Semaphore limiting concurrent page scrapes
+            url: Company URL
+            pending_writes: Scrape results waiting to be written to the database
         
+        Returns:
+            True if the company was scraped, False if it needs the browser
+        """
+        async with semaphore:
+            company_data = await self._scrape_static(client, url)
+            if not company_data:
+                return False
+            
+            # Queue company data for storage in the database
+            await self._queue_scrape_result(pending_writes, url, company_data)
+            return True
+    
+    async def _scrape_static(self, client: httpx.AsyncClient, url: str) -> Optional[Dict]:
+        """
+        Scrape a company page from its static HTML, without a browser.
+        
+        Args:
+            client: HTTP client
+            url: Company URL
+        
+        Returns:
+            Dictionary of scraped company data, or None if the static HTML
+            could not be fetched or does not contain the rendered content
+        """
+        logger.info(f"Fetching company page: {url}")
+        
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            
+            # Parse once: the same tree is checked for rendered content and then extracted from
+            tree = LexborHTMLParser(response.text)
+            if not all(tree.css_first(selector) for selector in RENDERED_CONTENT_SELECTORS):
+                logger.info(f"Static HTML for {url} is incomplete, falling back to browser")
+                return None
+            
+            return self._parse_company_tree(tree, url)
+        
+        except Exception as e:
+            # Any failure (not just HTTP errors) leaves the page to the browser instead of aborting the run
+            logger.info(f"Static scrape failed for {url}, falling back to browser: {e}")
+            return None
+    
+    def _parse_company_tree(self, tree: LexborHTMLParser, url: str) -> Dict:
+        """
+        Extract detailed company information from a parsed company page.
+        
+        Args:
+            tree: Parsed company page HTML
+            url: Company URL
+        
+        Returns:
+            Dictionary containing all extracted company information
+        """
         # Extract company name from h1
-        name_element = soup.find('h1')
-        name = name_element.text.strip() if name_element else "Unknown"
+        name_element = tree.css_first('h1')
+        name = _node_text(name_element).strip() if name_element else "Unknown"
         
         # Extract description from the div with class "prose hidden max-w-full md:block"
-        description_element = soup.find('div', class_='prose hidden max-w-full md:block')
+        description_element = tree.css_first(DESCRIPTION_SELECTOR)
         description = None
         if description_element:
-            desc_div = description_element.find('div', class_='text-xl')
+            desc_div = description_element.css_first('div.text-xl')
             if desc_div:
-                description = desc_div.text.strip()
+                description = _node_text(desc_div).strip()
         
         # Extract location from the location pill
         location = None
-        location_link = soup.find('a', href=lambda x: x and '/companies/location/' in x)
+        location_link = tree.css_first(LOCATION_LINK_SELECTOR)
         if location_link:
-            location_div = location_link.find('div', class_='yc-tw-Pill')
+            location_div = location_link.css_first('div.yc-tw-Pill')
             if location_div:
-                location = location_div.text.strip()
+                location = _node_text(location_div).strip()
         
         # Extract founder information from the grid
-        founder_grid = soup.find('div', class_='grid grid-cols-1 gap-6 sm:grid-cols-2')
+        founder_grid = tree.css_first(FOUNDER_GRID_SELECTOR)
         founder_names = []
         founder_linkedin_urls = []
         
         if founder_grid:
-            for founder_card in founder_grid.find_all('div', class_='ycdc-card-new'):
+            for founder_card in founder_grid.css('div.ycdc-card-new'):
                 # Get founder name
-                name_div = founder_card.find('div', class_='text-xl font-bold')
+                name_div = founder_card.css_first('div[class="text-xl font-bold"]')
                 if name_div:
-                    founder_names.append(name_div.text.strip())
+                    founder_names.append(_node_text(name_div).strip())
                 
                 # Get founder LinkedIn
-                linkedin_link = founder_card.find('a', href=lambda x: x and 'linkedin.com/in/' in x)
+                linkedin_link = founder_card.css_first(FOUNDER_LINKEDIN_SELECTOR)
                 if linkedin_link:
-                    founder_linkedin_urls.append(linkedin_link['href'])
+                    founder_linkedin_urls.append(linkedin_link.attributes['href'])
         
         # Extract company LinkedIn URLs
-        company_linkedin_links = soup.find_all('a', href=lambda x: x and 'linkedin.com/company/' in x)
-        company_linkedin_urls = [link['href'] for link in company_linkedin_links]
+        company_linkedin_links = tree.css(COMPANY_LINKEDIN_SELECTOR)
+        company_linkedin_urls = [link.attributes['href'] for link in company_linkedin_links]
         
         # Extract company website (first non-social external link)
         company_website = None
         
         # First try to find website with the link icon
-        website_link = soup.find('a', class_=lambda x: x and 'mb-2' in x and 'whitespace-nowrap' in x)
+        website_link = tree.css_first(WEBSITE_LINK_SELECTOR)
         if website_link:
-            href = website_link.get('href')
+            href = website_link.attributes.get('href')
             if href and href.startswith(('http://', 'https://')):
                 company_website = href
         
-        # If not found, try other external links
+        # If not found, take the first other external link; the selector leaves
+        # only https links for the host check
         if not company_website:
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link['href']
-                if (href.startswith('https://') and 
-                    not any(x in href for x in ['linkedin.com', 'youtube.com', 'ycombinator.com', 
-                                              'startupschool.org', 'twitter.com', 'x.com', 
-                                              'facebook.com', 'instagram.com', 'calendly.com'])):
-                    company_website = href
-                    break
+            company_website = next(
+                (
+                    href for href in (link.attributes['href'] for link in tree.css(EXTERNAL_LINK_SELECTOR))
+                    if not _is_non_company_link(href)
+                ),
+                None
+            )
         
         # Extract YC batch from the batch pill
         yc_batch = None
-        batch_link = soup.find('a', href=lambda x: x and '/companies?batch=' in x)
+        batch_link = tree.css_first(BATCH_LINK_SELECTOR)
         if batch_link:
-            batch_div = batch_link.find('div', class_='yc-tw-Pill')
+            batch_div = batch_link.css_first('div.yc-tw-Pill')
             if batch_div:
                 # Find the span containing just the batch text
-                batch_span = batch_div.find('span')
+                batch_span = batch_div.css_first('span')
                 if batch_span:
-                    yc_batch = batch_span.text.strip()
+                    yc_batch = _node_text(batch_span).strip()
                 else:
-                    yc_batch = batch_div.text.strip()
+                    yc_batch = _node_text(batch_div).strip()
                     # Remove "Y Combinator Logo" if present
                     yc_batch = yc_batch.replace('Y Combinator Logo', '').strip()
         
@@ -235,48 +602,32 @@ class CompanyScraper:
         launches_text = []
         
         # First get the main section content
-        main_section = soup.find('section', class_=lambda x: x and 'relative' in x and 'isolate' in x)
+        main_section = tree.css_first(MAIN_SECTION_SELECTOR)
         if main_section:
-            launches_text.append(main_section.get_text(separator=' ', strip=True))
+            launches_text.append(_node_text(main_section, separator=' ', strip=True))
         
         # Then get the detailed launch post content
-        launch_card = soup.find('div', class_='ycdc-card-new w-full max-w-[800px] rounded-xl p-8')
+        launch_card = tree.css_first(LAUNCH_CARD_SELECTOR)
         if launch_card:
             # Get the title
-            title_div = launch_card.find('div', class_='flex-grow pb-2 text-3xl font-bold')
+            title_div = launch_card.css_first(LAUNCH_TITLE_SELECTOR)
             if title_div:
                 launches_text.append("\nLAUNCH POST:")
-                launches_text.append(title_div.get_text(strip=True))
+                launches_text.append(_node_text(title_div, strip=True))
             
             # Get the full launch post content
-            article_container = launch_card.find('div', class_='launches-article-container')
+            article_container = launch_card.css_first('div.launches-article-container')
             if article_container:
                 # Process each paragraph and list
-                for element in article_container.find_all(['p', 'ul', 'li', 'strong']):
-                    if element.name == 'p':
-                        text = ""
-                        for content in element.contents:
-                            if content.name == 'a':
-                                text += f"{content.get_text(strip=True)} ({content.get('href')}) "
-                            elif content.name == 'strong':
-                                text += f"**{content.get_text(strip=True)}** "
-                            elif isinstance(content, str):
-                                text += content.strip() + " "
-                        launches_text.append(text.strip())
-                    elif element.name == 'ul':
+                for element in article_container.css('p, ul, li, strong'):
+                    if element.tag == 'p':
+                        launches_text.append(_inline_text(element).strip())
+                    elif element.tag == 'ul':
                         launches_text.append("")  # Add blank line before list
-                    elif element.name == 'li':
-                        text = "- "  # Add bullet point
-                        for content in element.contents:
-                            if content.name == 'a':
-                                text += f"{content.get_text(strip=True)} ({content.get('href')}) "
-                            elif content.name == 'strong':
-                                text += f"**{content.get_text(strip=True)}** "
-                            elif isinstance(content, str):
-                                text += content.strip() + " "
-                        launches_text.append(text.strip())
-                    elif element.name == 'strong':
-                        launches_text.append(f"**{element.get_text(strip=True)}**")
+                    elif element.tag == 'li':
+                        launches_text.append(("- " + _inline_text(element)).strip())  # Add bullet point
+                    elif element.tag == 'strong':
+                        launches_text.append(f"**{_node_text(element, strip=True)}**")
         
         # Join all text with proper spacing
         final_text = "\n\n".join(filter(None, launches_text))
@@ -294,144 +645,139 @@ class CompanyScraper:
             "yc_batch": yc_batch
         }
     
-    def _extract_batch_from_url(self, url: str) -> str:
+    def _extract_batch_from_url(self, url: str) -> Optional[str]:
         """
-        Extract YC batch identifier from URL or other sources.
+        Extract YC batch identifier from a company URL.
         
         Args:
             url: Company URL
         
         Returns:
-            YC batch identifier (e.g., "W25") or "Unknown"
+            YC batch identifier (e.g., "W25"), or None if the URL does not contain one
         """
         # Try to extract batch from URL (assuming format like /companies/some-company/w25)
-        match = re.search(r'([ws]\d{2})(/|$)', url.lower())
+        match = BATCH_IN_URL_PATTERN.search(url)
         
         if match:
-            batch = match.group(1).upper()
-            return batch
+            return match.group(1).upper()
         
-        # If we can't extract batch from URL, try to get it from database
-        return self._get_batch_from_database(url)
+        return None
     
-    def _get_batch_from_database(self, url: str) -> str:
+    def _store_scrape_results(self, results: List[Tuple[str, Optional[Dict]]]) -> None:
         """
-        Get YC batch identifier from database.
+        Store a batch of scrape results in the database.
         
-        Args:
-            url: Company URL
+        URL records for the whole batch are loaded up front, company data is
+        upserted with a single INSERT ... ON CONFLICT statement, and everything
+        is written in one commit. If that commit fails, each result is retried
+        on its own so one bad row does not lose the rest of the batch.
         
-        Returns:
-            YC batch identifier or "Unknown"
+        Args:
+            results: (URL, extracted company data) pairs; data is None for URLs that failed
         """
         session = self.db.get_session()
         
         try:
-            url_record = session.query(CompanyUrlRecord).filter_by(url=url).first()
-            
-            if url_record and url_record.batch:
-                return url_record.batch
-            
-            return "Unknown"
+            self._apply_scrape_results(session, results)
+            session.commit()
+            logger.info(f"Stored scrape results for {len(results)} company pages")
+        
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error storing scrape results for {len(results)} company pages, retrying individually: {e}")
+            self._store_scrape_results_individually(session, results)
         
         finally:
             session.close()
     
-    def _store_company_data(self, data: Dict, url: str) -> None:
+    def _store_scrape_results_individually(self, session: Session, results: List[Tuple[str, Optional[Dict]]]) -> None:
         """
-        Store the extracted company data in the database.
+        Store scrape results one commit at a time.
         
         Args:
-            data: Extracted company data
-            url: Company URL
+            session: Database session
+            results: (URL, extracted company data) pairs; data is None for URLs that failed
         """
-        session = self.db.get_session()
+        failed_urls = []
         
-        try:
-            # Get the URL record
-            url_record = session.query(CompanyUrlRecord).filter_by(url=url).first()
-            
-            if not url_record:
-                logger.error(f"URL record not found for {url}")
-                return
-            
-            # Check if company data already exists
-            existing_data = session.query(CompanyData).filter_by(url_record_id=url_record.id).first()
-            
-            if existing_data:
-                # Update existing record
-                existing_data.name = data["name"]
-                existing_data.location = data["location"]
-                existing_data.description = data["description"]
-                existing_data.yc_website = data["yc_website"]
-                existing_data.company_website = data["company_website"]
-                existing_data.set_founder_names(data["founder_names"])
-                existing_data.set_company_linkedin_urls(data["company_linkedin_urls"])
-                existing_data.set_founder_linkedin_urls(data["founder_linkedin_urls"])
-                existing_data.company_launches = data["company_launches"]
-                existing_data.yc_batch = data["yc_batch"]
-                existing_data.last_updated = datetime.utcnow()
-                
-                logger.info(f"Updated existing company data for {data['name']}")
-            else:
-                # Create new record
-                company_data = CompanyData(
-                    url_record_id=url_record.id,
-                    name=data["name"],
-                    location=data["location"],
-                    description=data["description"],
-                    yc_website=data["yc_website"],
-                    company_website=data["company_website"],
-                    yc_batch=data["yc_batch"],
-                    company_launches=data["company_launches"],
-                )
-                
-                # Set list fields
-                company_data.set_founder_names(data["founder_names"])
-                company_data.set_company_linkedin_urls(data["company_linkedin_urls"])
-                company_data.set_founder_linkedin_urls(data["founder_linkedin_urls"])
-                
-                session.add(company_data)
-                logger.info(f"Added new company data for {data['name']}")
-            
-            # Update URL record
-            url_record.last_scraped = datetime.utcnow()
-            url_record.scrape_status = "completed" if data["company_launches"] else "completed_no_launch"
+        for result in results:
+            try:
+                self._apply_scrape_results(session, [result])
+                session.commit()
             
-            session.commit()
-            logger.info(f"Successfully stored company data for {data['name']}")
-        
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error storing company data: {e}")
-        
-        finally:
-            session.close()
+            except Exception as e:
+                session.rollback()
+                failed_urls.append(result[0])
+                logger.error(f"Error storing scrape result for {result[0]}: {e}")
+        
+        if failed_urls:
+            logger.error(f"Scrape results lost for URLs: {failed_urls}")
+        else:
+            logger.info(f"Stored scrape results for {len(results)} company pages")
     
-    def _mark_url_as_failed(self, url: str) -> None:
+    def _apply_scrape_results(self, session: Session, results: List[Tuple[str, Optional[Dict]]]) -> None:
         """
-        Mark a URL as failed in the database.
+        Add scrape results to a session without committing.
         
         Args:
-            url: Company URL
+            session: Database session
+            results: (URL, extracted company data) pairs; data is None for URLs that failed
         """
-        session = self.db.get_session()
+        # Get the URL records for the batch
+        url_records = {
+            url_record.url: url_record
+            for url_record in session.query(CompanyUrlRecord).filter(
+                CompanyUrlRecord.url.in_([url for url, _ in results])
+            )
+        }
         
-        try:
-            url_record = session.query(CompanyUrlRecord).filter_by(url=url).first()
+        company_rows = []
+        
+        for url, data in results:
+            url_record = url_records.get(url)
             
-            if url_record:
-                url_record.last_scraped = datetime.utcnow()
+            if not url_record:
+                logger.error(f"URL record not found for {url}")
+                continue
+            
+            # Timestamped by the database when the batch is flushed
+            url_record.last_scraped = func.now()
+            
+            if data is None:
                 url_record.scrape_status = "failed"
-                session.commit()
                 logger.info(f"Marked URL as failed: {url}")
+                continue
+            
+            company_row = {
+                "url_record_id": url_record.id,
+                "name": data["name"],
+                "location": data["location"],
+                "description": data["description"],
+                "yc_website": data["yc_website"],
+                "company_website": data["company_website"],
+                # Same comma-separated format as the CompanyData list setters
+                "founder_names": ",".join(data["founder_names"]) or None,
+                "company_linkedin_urls": ",".join(data["company_linkedin_urls"]) or None,
+                "founder_linkedin_urls": ",".join(data["founder_linkedin_urls"]) or None,
+                "company_launches": data["company_launches"],
+                # Pages without a batch pill fall back to the URL, then to the batch the URL was discovered in
+                "yc_batch": data["yc_batch"] or self._extract_batch_from_url(url) or url_record.batch
+            }
+            
+            missing_columns = [column for column in REQUIRED_COMPANY_COLUMNS if not company_row[column]]
+            if missing_columns:
+                url_record.scrape_status = "failed"
+                logger.error(f"Marked URL as failed, missing {', '.join(missing_columns)}: {url}")
+                continue
+            
+            company_rows.append(company_row)
+            
+            # Update URL record
+            url_record.scrape_status = "completed" if data["company_launches"] else "completed_no_launch"
         
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error marking URL as failed: {e}")
-        
-        finally:
-            session.close()
+        if company_rows:
+            # Insert new companies and overwrite the scraped columns of existing ones
+            session.execute(COMPANY_UPSERT, company_rows)
     
     def get_companies_for_analysis(self, limit: Optional[int] = None) -> List[Dict]:
         """
@@ -447,7 +793,13 @@ class CompanyScraper:
         
         try:
             # Get company records that have been scraped successfully but not yet analyzed
-            query = session.query(CompanyData).join(
+            # Only select the columns needed for the analysis dictionaries, as plain rows
+            query = session.query(
+                CompanyData.id,
+                CompanyData.name,
+                CompanyData.company_launches,
+                CompanyData.yc_batch
+            ).join(
                 CompanyUrlRecord
             ).filter(
                 CompanyUrlRecord.scrape_status == "completed",
@@ -458,18 +810,7 @@ class CompanyScraper:
             if limit is not None:
                 query = query.limit(limit)
             
-            records = query.all()
-            
-            companies = []
-            for record in records:
-                companies.append({
-                    "id": record.id,
-                    "name": record.name,
-                    "company_launches": record.company_launches,
-                    "yc_batch": record.yc_batch
-                })
-            
-            return companies
+            return [row._asdict() for row in query]
         
         finally:
             session.close() 
\ No newline at end of file
@@ -1,20 +1,58 @@
-import time
+import asyncio
 import logging
 from typing import List, Dict, Optional
-from datetime import datetime
-from playwright.sync_api import sync_playwright, Page, Browser
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, Browser
+from sqlalchemy.dialects.sqlite import insert
 
 from src.config.config_manager import ConfigManager
 from src.storage.models import DatabaseManager, CompanyUrlRecord
+from src.scraper.company_scraper import block_unneeded_resources
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger("url_discovery")
 
+# Every company card in the directory is a link with this class
+COMPANY_CARD_SELECTOR = "a._company_i9oky_355"
+
+# Milliseconds to wait for more cards after a scroll before counting it as no change,
+# by number of scrolls in a row that found nothing: a short first check, then longer
+# waits so a slow response is not mistaken for the end of the list
+SCROLL_GROWTH_TIMEOUTS = (250, 1000, 3000)
+
+# Reads the batch's total from the "Showing N companies" text (which may use
+# thousands separators, e.g. "Showing 1,234 companies"), or null if it is not shown
+TOTAL_COMPANIES_SCRIPT = """
+() => {
+    const match = document.body.innerText.match(/Showing ([\\d,]+)/i);
+    return match ? parseInt(match[1].replace(/,/g, ""), 10) : null;
+}
+"""
+
+# Resolves with the number of company cards as soon as it grows past `previous`,
+# or after `timeout` milliseconds without growth; a MutationObserver reports new
+# cards immediately instead of waiting out a fixed delay
+WAIT_FOR_MORE_CARDS_SCRIPT = """
+([selector, previous, timeout]) => new Promise(resolve => {
+    const count = () => document.querySelectorAll(selector).length;
+    if (count() > previous) {
+        resolve(count());
+        return;
+    }
+    const observer = new MutationObserver(() => {
+        const current = count();
+        if (current > previous) {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(current);
+        }
+    });
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        resolve(count());
+    }, timeout);
+    observer.observe(document.body, {childList: true, subtree: true});
+})
+"""
+
 
 class YCDirectoryScraper:
     """
@@ -36,6 +74,9 @@ class YCDirectoryScraper:
         self.scroll_delay = self.config.get('scraper.scroll_delay', 1)
         self.timeout = self.config.get('scraper.timeout', 30000)
         self.selectors = self.config.get_selectors()
+        
+        # Number of batches scraped at once, each in its own browser context
+        self.directory_workers = self.config.get('scraper.directory_workers', 4)
     
     def scrape_directory(self, batch: str) -> List[str]:
         """
@@ -47,143 +88,160 @@ class YCDirectoryScraper:
         Returns:
             List of discovered company URLs
         """
-        logger.info(f"Starting to scrape YC directory for batch: {batch}")
+        return self.scrape_directories([batch])[batch]
+    
+    def scrape_directories(self, batches: List[str]) -> Dict[str, List[str]]:
+        """
+        Scrape the YC directory for company URLs of several batches.
+        
+        Batches are scraped concurrently in one browser, with at most
+        `scraper.directory_workers` batches in progress at once.
+        
+        Args:
+            batches: YC batch identifiers
+        
+        Returns:
+            Dictionary mapping each batch to its discovered company URLs
+        """
+        return asyncio.run(self._scrape_directories_async(batches))
+    
+    async def _scrape_directories_async(self, batches: List[str]) -> Dict[str, List[str]]:
+        """
+        Scrape directory pages concurrently with a shared browser.
+        
+        Args:
+            batches: YC batch identifiers
+        
+        Returns:
+            Dictionary mapping each batch to its discovered company URLs
+        """
+        semaphore = asyncio.Semaphore(self.directory_workers)
         
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(
                 headless=True  # Use headless mode for production
             )
             
             try:
-                context = browser.new_context(
-                    viewport={'width': 1920, 'height': 1080}
+                results = await asyncio.gather(
+                    *[self._scrape_batch_bounded(browser, semaphore, batch) for batch in batches],
+                    return_exceptions=True
                 )
-                page = context.new_page()
-                
-                # Navigate to the directory page with batch filter
-                encoded_batch = batch.replace(" ", "%20")
-                url = f"{self.directory_url}/?batch={encoded_batch}"
-                
-                # Navigate and wait for initial load
-                page.goto(url)
-                
-                # Wait for any company card to appear (they all have this class)
-                company_card_selector = "a._company_i9oky_355"
-                page.wait_for_selector(company_card_selector, timeout=30000)
-                
-                # Function to get current company count
-                def get_company_count():
-                    return len(page.query_selector_all(company_card_selector))
-                
-                # Scroll until we reach the bottom
-                last_count = 0
-                no_change_count = 0
-                max_no_change = 3  # Stop after 3 attempts with no new companies
-                
-                while no_change_count < max_no_change:
-                    # Get current count
-                    current_count = get_company_count()
-                    logger.info(f"Current company count: {current_count}")
-                    
-                    # Scroll to bottom
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    
-                    # Wait a bit for new content
-                    page.wait_for_timeout(1500)  # 1.5 seconds should be enough
-                    
-                    if current_count == last_count:
-                        no_change_count += 1
-                    else:
-                        no_change_count = 0  # Reset if we found new companies
-                        logger.info(f"Found {current_count - last_count} new companies")
-                    
-                    last_count = current_count
-                
-                # Now get all company URLs
-                company_elements = page.query_selector_all(company_card_selector)
-                company_urls = []
-                
-                for element in company_elements:
-                    href = element.get_attribute("href")
-                    if href and href.startswith("/companies/"):
-                        full_url = f"https://www.ycombinator.com{href}"
-                        company_urls.append(full_url)
-                
-                logger.info(f"Found {len(company_urls)} total companies")
-                
-                # Store URLs in database
-                self._store_company_urls(company_urls, batch)
-                
-                return company_urls
             
             finally:
-                browser.close()
+                await browser.close()
+        
+        # Re-raise the first error, once every batch has finished
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        
+        return dict(zip(batches, results))
     
-    def _scroll_to_load_all(self, page: Page) -> None:
+    async def _scrape_batch_bounded(self, browser: Browser, semaphore: asyncio.Semaphore, batch: str) -> List[str]:
         """
-        Scroll down the page to load all company cards.
+        Scrape the directory page of one batch once a worker slot is free.
         
         Args:
-            page: Browser page
-        """
-        logger.info("Scrolling to load all companies...")
-        
-        # Initial count
-        last_count = 0
-        no_change_count = 0
-        max_no_change = 3  # Stop after 3 attempts with no new companies
-        
-        while no_change_count < max_no_change:
-            # Get current count before scrolling
-            current_count = page.evaluate(f"document.querySelectorAll('{self.selectors.get('company_card')}').length")
-            
-            # Scroll to bottom
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            
-            # Wait for potential new content to load
-            page.wait_for_timeout(1000)  # 1 second
-            
-            if current_count == last_count:
-                no_change_count += 1
-            else:
-                no_change_count = 0  # Reset if we found new companies
-                
-            last_count = current_count
-            logger.info(f"Current company count: {current_count}")
+            browser: Browser instance
+            semaphore: Semaphore limiting concurrent batches
+            batch: YC batch identifier
         
-        logger.info(f"Finished scrolling, found {last_count} companies")
+        Returns:
+            List of discovered company URLs
+        """
+        async with semaphore:
+            return await self._scrape_batch(browser, batch)
     
-    def _extract_company_urls(self, page: Page) -> List[str]:
+    async def _scrape_batch(self, browser: Browser, batch: str) -> List[str]:
         """
-        Extract company URLs from the directory page.
+        Scrape the directory page of one batch in a new browser context.
         
         Args:
-            page: Browser page
+            browser: Browser instance
+            batch: YC batch identifier
         
         Returns:
-            List of company URLs
+            List of discovered company URLs
         """
-        html_content = page.content()
-        soup = BeautifulSoup(html_content, 'html.parser')
+        logger.info(f"Starting to scrape YC directory for batch: {batch}")
         
-        company_cards = soup.select(self.selectors.get('company_card', '.CompanyCard_root__wYiT9'))
-        company_urls = []
+        # Contexts are cheap compared to browsers, and keep batches isolated
+        context = await browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            service_workers="block"
+        )
         
-        for card in company_cards:
-            link_element = card.select_one(self.selectors.get('company_link', 'a[href]'))
+        try:
+            # Skip company logos, fonts, media and stylesheets
+            await context.route("**/*", block_unneeded_resources)
+            
+            page = await context.new_page()
+            
+            # Navigate to the directory page with batch filter
+            encoded_batch = batch.replace(" ", "%20")
+            url = f"{self.directory_url}/?batch={encoded_batch}"
+            
+            # Navigate and wait for initial load
+            await page.goto(url)
+            
+            # Wait for any company card to appear (they all have this class)
+            await page.wait_for_selector(COMPANY_CARD_SELECTOR, timeout=30000)
             
-            if link_element and "href" in link_element.attrs:
-                href = link_element["href"]
+            last_count = await page.evaluate("selector => document.querySelectorAll(selector).length", COMPANY_CARD_SELECTOR)
+            
+            # The total lets scrolling stop as soon as every card is loaded; a total
+            # below the cards already shown was misread, so it is not trusted
+            total = await page.evaluate(TOTAL_COMPANIES_SCRIPT)
+            if total is not None and total < last_count:
+                logger.warning(f"Ignoring listed total of {total} companies, {last_count} are already shown")
+                total = None
+            elif total is not None:
+                logger.info(f"Directory lists {total} companies")
+            
+            # Scroll until we reach the bottom
+            no_change_count = 0
+            max_no_change = len(SCROLL_GROWTH_TIMEOUTS)  # Without a total, stop once every wait found no new companies
+            
+            while no_change_count < max_no_change:
+                logger.info(f"Current company count: {last_count}")
                 
-                # Make sure we have a full URL
-                if href.startswith("/"):
-                    company_url = f"https://www.ycombinator.com{href}"
+                if total and last_count >= total:
+                    break
+                    
+                # Scroll to bottom
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    
+                # Wait until new cards are added to the page, or give up after the timeout
+                current_count = await page.evaluate(
+                    WAIT_FOR_MORE_CARDS_SCRIPT,
+                    [COMPANY_CARD_SELECTOR, last_count, SCROLL_GROWTH_TIMEOUTS[no_change_count]]
+                )
+                    
+                if current_count == last_count:
+                    no_change_count += 1
                 else:
-                    company_url = href
-                
-                company_urls.append(company_url)
+                    no_change_count = 0  # Reset if we found new companies
+                    logger.info(f"Found {current_count - last_count} new companies")
+                    
+                last_count = current_count
+            
+            # Now get all company URLs, reading every card's href in one call
+            hrefs = await page.eval_on_selector_all(
+                COMPANY_CARD_SELECTOR,
+                "cards => cards.map(card => card.getAttribute('href')).filter(href => href && href.startsWith('/companies/'))"
+            )
+            company_urls = [f"https://www.ycombinator.com{href}" for href in hrefs]
+            
+            logger.info(f"Found {len(company_urls)} total companies")
+            
+            # Store URLs in database (blocking, so keep it off the event loop)
+            await asyncio.to_thread(self._store_company_urls, company_urls, batch)
+            
+            return company_urls
         
-        return company_urls
+        finally:
+            await context.close()
     
     def _store_company_urls(self, urls: List[str], batch: str) -> None:
         """
@@ -196,22 +254,15 @@ class YCDirectoryScraper:
         session = self.db.get_session()
         
         try:
-            for url in urls:
-                # Check if URL already exists in database
-                existing_url = session.query(CompanyUrlRecord).filter_by(url=url).first()
-                
-                if existing_url:
-                    logger.info(f"URL already exists in database: {url}")
-                else:
-                    # Create new record
-                    new_url_record = CompanyUrlRecord(
-                        url=url,
-                        batch=batch,
-                        discovery_date=datetime.utcnow(),
-                        scrape_status="pending"
-                    )
-                    session.add(new_url_record)
-                    logger.info(f"Added new URL to database: {url}")
+            if urls:
+                # Insert every URL in one statement and let the unique index on url
+                # skip the ones that already exist (run on the connection, since the
+                # ORM's bulk insert result does not report a row count)
+                result = session.connection().execute(
+                    insert(CompanyUrlRecord).on_conflict_do_nothing(index_elements=[CompanyUrlRecord.url]),
+                    [{"url": url, "batch": batch, "scrape_status": "pending"} for url in urls]
+                )
+                logger.info(f"Added {result.rowcount} new URLs to database")
             
             session.commit()
             logger.info(f"Successfully stored {len(urls)} URLs for batch {batch}")
@@ -236,14 +287,15 @@ class YCDirectoryScraper:
         session = self.db.get_session()
         
         try:
-            query = session.query(CompanyUrlRecord).filter_by(scrape_status="pending")
+            # Only the URL column is needed, in discovery order (an index range scan)
+            query = session.query(CompanyUrlRecord.url).filter_by(
+                scrape_status="pending"
+            ).order_by(CompanyUrlRecord.id)
             
             if limit is not None:
                 query = query.limit(limit)
             
-            records = query.all()
-            
-            return [record.url for record in records]
+            return [url for (url,) in query]
         
         finally:
             session.close() 
\ No newline at end of file
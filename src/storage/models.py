@@ -1,11 +1,41 @@
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, create_engine
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, Index, create_engine, event, func, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import Session, relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 Base = declarative_base()
 
+# Applied to every new SQLite connection: WAL lets exports and Notion syncs read
+# while scrapers write, and the rest speeds up large scans
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-200000",  # ~200 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped I/O
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Configure a new SQLite connection.
+    
+    Args:
+        dbapi_connection: Raw sqlite3 connection
+        connection_record: Pool record for the connection
+    """
+    cursor = dbapi_connection.cursor()
+    
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    
+    finally:
+        cursor.close()
+
+
 class CompanyUrlRecord(Base):
     """
     Model for storing company URL records found in the YC directory.
@@ -15,10 +45,16 @@ class CompanyUrlRecord(Base):
     id = Column(Integer, primary_key=True)
     url = Column(String(255), unique=True, nullable=False)
     batch = Column(String(10), nullable=False)
-    discovery_date = Column(DateTime, default=datetime.utcnow)
+    discovery_date = Column(DateTime, default=func.now())
     last_scraped = Column(DateTime, nullable=True)
     scrape_status = Column(String(50), default="pending")  # pending, completed, failed
     notion_page_id = Column(String(255), nullable=True)
+    notion_content_hash = Column(String(32), nullable=True)  # Hash of the last properties synced to Notion
+    
+    # Index for selecting URLs by scrape status in discovery order
+    __table_args__ = (
+        Index("ix_urls_status_id", scrape_status, id),
+    )
     
     # Relationship to CompanyData
     company_data = relationship("CompanyData", back_populates="url_record", uselist=False)
@@ -56,35 +92,63 @@ class CompanyData(Base):
     # Company launch text for AI analysis
     company_launches = Column(Text, nullable=True)
     
-    # Record metadata
-    last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Record metadata, timestamped by the database when a row is inserted or changed
+    last_updated = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # AI Classification fields
     ai_core_theme = Column(String(100), nullable=True)
     ai_tags = Column(Text, nullable=True)  # Comma-separated
     ai_rationale = Column(Text, nullable=True)
     
+    # One company per URL record (the scraper's upsert key), plus indexes for
+    # batch exports and for selecting analyzed companies
+    __table_args__ = (
+        Index("ux_company_url_record", url_record_id, unique=True),
+        Index("ix_company_yc_batch", yc_batch),
+        Index("ix_company_analyzed", id, sqlite_where=ai_core_theme.isnot(None)),
+    )
+    
     # Relationship to CompanyUrlRecord
     url_record = relationship("CompanyUrlRecord", back_populates="company_data")
     
     def __repr__(self):
         return f"<CompanyData(name='{self.name}', batch='{self.yc_batch}')>"
     
+    def _get_list(self, field: str) -> List[str]:
+        """
+        Split a comma-separated field, reusing the result until the field changes.
+        
+        Args:
+            field: Name of the comma-separated column
+        
+        Returns:
+            List of values (shared between calls, so it must not be modified)
+        """
+        value = getattr(self, field)
+        
+        # Cache on the instance, keyed by the raw value so assignments invalidate it
+        cache = self.__dict__.setdefault("_list_cache", {})
+        cached = cache.get(field)
+        if cached is None or cached[0] != value:
+            cached = cache[field] = (value, value.split(",") if value else [])
+        
+        return cached[1]
+    
     def get_company_linkedin_url_list(self) -> List[str]:
         """Get company LinkedIn URLs as a list."""
-        return self.company_linkedin_urls.split(",") if self.company_linkedin_urls else []
+        return self._get_list("company_linkedin_urls")
     
     def get_founder_linkedin_url_list(self) -> List[str]:
         """Get founder LinkedIn URLs as a list."""
-        return self.founder_linkedin_urls.split(",") if self.founder_linkedin_urls else []
+        return self._get_list("founder_linkedin_urls")
     
     def get_founder_names_list(self) -> List[str]:
         """Get founder names as a list."""
-        return self.founder_names.split(",") if self.founder_names else []
+        return self._get_list("founder_names")
     
     def get_ai_tags_list(self) -> List[str]:
         """Get AI tags as a list."""
-        return self.ai_tags.split(",") if self.ai_tags else []
+        return self._get_list("ai_tags")
     
     def set_company_linkedin_urls(self, urls: List[str]) -> None:
         """Set company LinkedIn URLs from a list."""
@@ -114,9 +178,47 @@ class DatabaseManager:
         Args:
             db_path: Path to the SQLite database file
         """
-        self.engine = create_engine(f"sqlite:///{db_path}")
+        # Pooled connections are reused across sessions; pre-ping replaces
+        # connections that went stale during long scraping or LLM runs, and
+        # writers from concurrent threads wait up to 30s for the write lock
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            connect_args={"check_same_thread": False, "timeout": 30.0},
+            poolclass=QueuePool,
+            pool_size=20,
+            max_overflow=10,
+            pool_pre_ping=True,
+            pool_recycle=1800
+        )
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        self._migrate_schema()
+        
+        # Sessions only write what they are told to and commit explicitly, so skip
+        # the flush before every query and keep loaded attributes after commit
+        # instead of re-selecting them on next access
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+    
+    def _migrate_schema(self) -> None:
+        """
+        Add columns and indexes that are missing from tables created by an older version.
+        
+        create_all only creates missing tables, so new nullable columns and
+        indexes are added to existing databases here.
+        """
+        inspector = inspect(self.engine)
+        
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+                
+                for column in table.columns:
+                    if column.name not in existing_columns:
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
     
     def get_session(self):
         """
@@ -125,4 +227,28 @@ class DatabaseManager:
         Returns:
             SQLAlchemy session
         """
-        return self.Session() 
\ No newline at end of file
+        return self.Session() 
+    
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """
+        Provide a session for a whole operation.
+        
+        The session is committed if the block succeeds, rolled back if it
+        raises, and closed either way.
+        
+        Yields:
+            SQLAlchemy session
+        """
+        session = self.Session()
+        
+        try:
+            yield session
+            session.commit()
+        
+        except Exception:
+            session.rollback()
+            raise
+        
+        finally:
+            session.close()
\ No newline at end of file
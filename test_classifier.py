@@ -1,18 +1,34 @@
 #!/usr/bin/env python3
 import os
+import logging
+from sqlalchemy.orm import load_only
 from src.config.config_manager import ConfigManager
 from src.storage.models import DatabaseManager, CompanyData
 from src.analyzer.llm_analyzer import LLMAnalyzer
 
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
 def main():
     # Initialize managers
     config = ConfigManager()
     db = DatabaseManager('data/yc_companies.db')
     analyzer = LLMAnalyzer(config, db)
     
-    # Get a company that has been classified before
+    # Get a company that has been classified before, loading only the columns used here
     session = db.get_session()
-    company = session.query(CompanyData).filter(
+    company = session.query(CompanyData).options(
+        load_only(
+            CompanyData.name,
+            CompanyData.company_launches,
+            CompanyData.ai_core_theme,
+            CompanyData.ai_tags,
+            CompanyData.ai_rationale
+        )
+    ).filter(
         CompanyData.ai_core_theme.isnot(None)
     ).first()
     
@@ -41,8 +57,8 @@ def main():
         "company_launches": company.company_launches
     }])
     
-    # Refresh company data
-    session.refresh(company)
+    # Refresh the classification written by the analyzer's session
+    session.refresh(company, ["ai_core_theme", "ai_tags", "ai_rationale"])
     
     # Print new classification
     print("\nNew Classification:")